@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Anel de frames em memória compartilhada (multiprocessing.shared_memory) entre a captura
+# e os processos de inferência. A captura grava cada frame em um slot pré-alocado e só
+# (slot, sequência) atravessa a fronteira entre processos; os processos leem o frame como
+# uma view NumPy do mesmo buffer, sem cópia. O anel tem 'n_slots' frames: um slot é
+# sobrescrito n_slots frames depois, então o leitor confere a sequência antes e depois de usar.
+# A view entregue por escrever() é um FrameAnel, que leva junto a (slot, sequência) gravada:
+# quem envia o frame adiante confere essa sequência, não a que o slot tem no momento.
+
+# Anéis abertos por nome neste processo (os processos de inferência recebem o anel a cada
+# requisição); só os mais recentes ficam mapeados
+_ANEIS_CONECTADOS = OrderedDict()
+MAX_ANEIS_CONECTADOS = 4
+
+
+def _abrir_memoria(nome):
+    try:
+        # Python >= 3.13: quem só conecta não deve registrar (nem remover) o segmento
+        return shared_memory.SharedMemory(name=nome, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=nome)
+
+
+def _conectar(nome, n_slots, forma, dtype):
+    anel = _ANEIS_CONECTADOS.get(nome)
+    if anel is None:
+        anel = AnelFrames(n_slots, forma, dtype, nome=nome)
+        _ANEIS_CONECTADOS[nome] = anel
+        if len(_ANEIS_CONECTADOS) > MAX_ANEIS_CONECTADOS:
+            _, antigo = _ANEIS_CONECTADOS.popitem(last=False)
+            antigo.fechar()
+    else:
+        _ANEIS_CONECTADOS.move_to_end(nome)
+    return anel
+
+
+class FrameAnel(np.ndarray):
+    """
+    View de um slot do AnelFrames com a posição (slot, sequencia) em que escrever() o gravou.
+    Recortes e cópias não são o frame do slot: ficam com posicao None.
+    """
+
+    posicao = None
+
+
+class AnelFrames:
+    """
+    n_slots frames de 'forma'/'dtype' em um segmento de memória compartilhada, precedidos
+    por um cabeçalho int64 com a sequência gravada em cada slot (-1 = gravação em andamento).
+    nome=None cria o segmento (o criador chama destruir() no fim); com nome, conecta a um
+    segmento existente. Ao ser enviado a outro processo (pickle), o anel viaja só como
+    nome + formato e é reconectado (uma vez por processo) do outro lado.
+    """
+
+    def __init__(self, n_slots, forma, dtype=np.uint8, nome=None):
+        self.n_slots = int(n_slots)
+        self.forma = tuple(int(v) for v in forma)
+        self.dtype = np.dtype(dtype)
+
+        bytes_cabecalho = 8 * self.n_slots
+        self.bytes_por_slot = int(np.prod(self.forma)) * self.dtype.itemsize
+        tamanho = bytes_cabecalho + self.n_slots * self.bytes_por_slot
+
+        self.criador = nome is None
+        if self.criador:
+            self._memoria = shared_memory.SharedMemory(create=True, size=tamanho)
+        else:
+            self._memoria = _abrir_memoria(nome)
+        self.nome = self._memoria.name
+
+        self.sequencias = np.ndarray((self.n_slots,), dtype=np.int64, buffer=self._memoria.buf)
+        self.slots = np.ndarray((self.n_slots,) + self.forma, dtype=self.dtype, buffer=self._memoria.buf,
+                                offset=bytes_cabecalho)
+        if self.criador:
+            self.sequencias[:] = 0
+        self._proxima = int(self.sequencias.max()) + 1
+
+    def __reduce__(self):
+        return _conectar, (self.nome, self.n_slots, self.forma, self.dtype.str)
+
+    def escrever(self, frame):
+        """Copia o frame para o próximo slot. Retorna (slot, sequencia, view do slot como FrameAnel)."""
+        sequencia = self._proxima
+        slot = sequencia % self.n_slots
+        self.sequencias[slot] = -1
+        np.copyto(self.slots[slot], frame)
+        self.sequencias[slot] = sequencia
+        self._proxima += 1
+
+        view = self.slots[slot].view(FrameAnel)
+        view.posicao = (slot, sequencia)
+        return slot, sequencia, view
+
+    def ler(self, slot, sequencia):
+        """View (sem cópia) do frame 'sequencia', ou None se o slot já foi sobrescrito."""
+        if self.sequencias[slot] != sequencia:
+            return None
+        return self.slots[slot]
+
+    def valido(self, slot, sequencia):
+        """O slot ainda guarda o frame 'sequencia' (conferir depois de usar a view)."""
+        return self.sequencias[slot] == sequencia
+
+    def localizar(self, frame):
+        """
+        (slot, sequencia) gravados por escrever() se 'frame' for a view de um slot deste anel
+        (FrameAnel), senão None. RuntimeError se o slot já foi sobrescrito ou está sendo gravado:
+        a view não mostra mais o frame que foi entregue.
+        """
+        posicao = getattr(frame, "posicao", None)
+        if posicao is None or frame.shape != self.forma or frame.dtype != self.dtype:
+            return None
+        deslocamento = frame.__array_interface__["data"][0] - self.slots.__array_interface__["data"][0]
+        if deslocamento < 0 or deslocamento % self.bytes_por_slot != 0:
+            return None
+        slot = deslocamento // self.bytes_por_slot
+        if slot >= self.n_slots or slot != posicao[0]:
+            return None
+        if not self.valido(*posicao):
+            raise RuntimeError("Frame sobrescrito no AnelFrames antes do envio ao encoding")
+        return posicao
+
+    def fechar(self):
+        # As views precisam sair de escopo antes de fechar o mapeamento
+        self.sequencias = None
+        self.slots = None
+        try:
+            self._memoria.close()
+        except BufferError:
+            # Ainda há views em uso: o mapeamento é liberado quando elas saírem de escopo
+            pass
+
+    def destruir(self):
+        """Fecha e remove o segmento (só o criador)."""
+        self.fechar()
+        if self.criador:
+            self._memoria.unlink()
@@ -0,0 +1,66 @@
+import time
+import numpy as np
+
+
+class CacheEmbeddings:
+    """
+    Cache de encodings por trilha (id do RastreadorFaces).
+    Enquanto a face acompanhada não mudar muito, o encoding calculado uma vez é
+    reutilizado nos frames seguintes. A entrada é invalidada quando:
+      - o centro da caixa se desloca mais que fracao_movimento da largura;
+      - a escala da caixa muda mais que o fator variacao_escala;
+      - o encoding tem mais de ttl segundos.
+    """
+
+    def __init__(self, fracao_movimento=0.3, variacao_escala=1.25, ttl=2.0):
+        self.fracao_movimento = fracao_movimento
+        self.variacao_escala = variacao_escala
+        self.ttl = ttl
+
+        # id da trilha -> (encoding, bbox no momento do encoding, instante)
+        self._entradas = {}
+
+        # Estatística: consultas atendidas pelo cache
+        self.acertos = 0
+        self.faltas = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def limpar(self):
+        self._entradas.clear()
+
+    def obter(self, trilha, agora=None):
+        """Encoding em cache da trilha, ou None se não houver ou estiver inválido."""
+        entrada = self._entradas.get(trilha.id)
+        if entrada is not None and self._valida(entrada, trilha.bbox, agora):
+            self.acertos += 1
+            return entrada[0]
+
+        self._entradas.pop(trilha.id, None)
+        self.faltas += 1
+        return None
+
+    def guardar(self, trilha, encoding, agora=None):
+        agora = time.monotonic() if agora is None else agora
+        self._entradas[trilha.id] = (np.asarray(encoding), tuple(trilha.bbox), agora)
+
+    def descartar_ausentes(self, trilhas):
+        """Remove as entradas de trilhas que não estão mais ativas."""
+        ativas = {t.id for t in trilhas}
+        for id_trilha in [i for i in self._entradas if i not in ativas]:
+            del self._entradas[id_trilha]
+
+    def _valida(self, entrada, bbox, agora):
+        _, (x0, y0, w0, h0), instante = entrada
+        agora = time.monotonic() if agora is None else agora
+        if agora - instante > self.ttl:
+            return False
+
+        x, y, w, h = bbox
+        deslocamento = np.hypot((x + w / 2) - (x0 + w0 / 2), (y + h / 2) - (y0 + h0 / 2))
+        if deslocamento > self.fracao_movimento * w0:
+            return False
+
+        escala = w / float(w0) if w0 > 0 else np.inf
+        return 1.0 / self.variacao_escala <= escala <= self.variacao_escala
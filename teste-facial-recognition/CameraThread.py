@@ -1,8 +1,33 @@
 
+import time
 import cv2
 import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 from Reconhecedor import Reconhecedor
+from RastreadorFaces import RastreadorFaces
+from CacheEmbeddings import CacheEmbeddings
+from DecisaoSequencial import DecisaoSequencial, ACEITAR
+from FusaoEmbeddings import FusaoEmbeddings
+from CapturaCamera import CapturaCamera
+from PipelineReconhecimento import PipelineReconhecimento
+from InferenciaProcessos import EncoderRemoto
+from AnelFrames import AnelFrames
+
+# Detecção completa a cada N frames; nos demais as caixas vêm do rastreador
+INTERVALO_DETECCAO = 10
+
+# "sequencial": SPRT sobre a distância de cada frame (DecisaoSequencial)
+# "fusao": média ponderada dos encodings da trilha (FusaoEmbeddings); decide quando
+#          o template fundido da face reportada reúne AMOSTRAS_FUSAO encodings
+DECISAO = "sequencial"
+AMOSTRAS_FUSAO = 3
+# Na fusão, a face parada é recodificada a cada TTL_CACHE_FUSAO segundos (amostra nova)
+TTL_CACHE_FUSAO = 0.25
+
+# Com o encoding em processos (EncoderRemoto), os frames passam por um anel de memória
+# compartilhada com esse número de slots. Um slot é regravado SLOTS_ANEL frames depois
+# (~0.5 s a 30 fps), o limite para um frame atravessar o pipeline.
+SLOTS_ANEL = 16
 
 class CameraThread(QThread):
 
@@ -19,7 +44,25 @@ class CameraThread(QThread):
 
         self.acesso_finalizado = False
 
+        # Os landmarks da detecção (YuNet) ficam em cada trilha, para o alinhamento do SFace
+        self.rastreador = RastreadorFaces(lambda frame: recon_engine.detectar_faces(frame, com_landmarks=True),
+                                          INTERVALO_DETECCAO)
+        # Encoding por trilha: uma face estável não é recodificada a cada frame
+        self.cache_embeddings = CacheEmbeddings(ttl=TTL_CACHE_FUSAO) if DECISAO == "fusao" else CacheEmbeddings()
+        self.fusao = FusaoEmbeddings() if DECISAO == "fusao" else None
+        self.trilhas = []
+        # Acúmulo da evidência de vários frames antes de conceder/negar (SPRT)
+        self.decisao = DecisaoSequencial(recon_engine.TOLERANCIA)
+        self.frames_consumidos = 0
+        # Idade (ms) do frame no momento em que o último resultado ficou pronto
+        self.latencia_ms = 0.0
+
     def run(self):
+        # Nova sessão: a ROI de detecção não deve herdar a posição da sessão anterior
+        self.recon_engine.reiniciar_sessao()
+        self.decisao.reiniciar()
+        if self.fusao is not None:
+            self.fusao.limpar()
         cap = cv2.VideoCapture(0)
 
         if not cap.isOpened():
@@ -28,43 +71,117 @@ class CameraThread(QThread):
             self.resultado_reconhecimento_signal.emit(("Erro", 0, "WEBCAM_FALHA"))
             return
 
-        while self._run_flag:
-            ret, frame = cap.read()
-            if ret:
-                id_rec, nivel_max, status, bbox = self.recon_engine.autenticar(
-                    frame,
-                    self.nivel_desejado,
-                    self.id_esperado
-                )
-
-                if bbox:
-                    x, y, w, h = bbox
-                    cor = (0, 0, 255)
-
-                    if status == "ACESSO CONCEDIDO":
-                        cor = (0, 255, 0)  # Verde
-
-
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), cor, 2)
-                    cv2.putText(frame, status, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, cor, 2)
-
-                self.change_pixmap_signal.emit(frame)
-
-                self.resultado_reconhecimento_signal.emit((id_rec, nivel_max, status))
-
-
-                if status == "ACESSO CONCEDIDO":
-                    self.acesso_finalizado = True
-                    self.stop()
-                elif "NEGADO" in status:
-                    self.acesso_finalizado = True
-                    self.stop()
-
-            cv2.waitKey(1)
-
+        # Sem fila no driver: o frame entregue é o da cena atual
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._sobreposicao = (None, "")
+        self.anel = None
+        if isinstance(self.recon_engine.encoder, EncoderRemoto):
+            largura = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            altura = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.anel = AnelFrames(SLOTS_ANEL, (altura, largura, 3))
+            self.recon_engine.encoder.anel = self.anel
+        # A captura (e a exibição) segue no ritmo da câmera; o reconhecimento pega sempre o último frame
+        self.captura = CapturaCamera(cap, self._exibir, self.anel)
+        self.captura.iniciar()
+
+        # Detecção do frame N+1 em paralelo com o encoding do frame N
+        self.pipeline = PipelineReconhecimento(self.captura, self.rastreador, self.recon_engine,
+                                               self.nivel_desejado, self.id_esperado,
+                                               self.cache_embeddings, self.fusao)
+        self.pipeline.iniciar()
 
+        while self._run_flag:
+            saida = self.pipeline.resultado()
+            if saida is None:
+                continue
+            _, instante, self.trilhas, (id_rec, nivel_max, status, bbox), distancia = saida
+
+            if self.fusao is not None:
+                status = self._decisao_fusao(status, bbox)
+            else:
+                id_rec, nivel_max, status = self._decisao_sequencial(id_rec, nivel_max, status, bbox, distancia)
+
+            # Idade do frame quando o resultado ficou pronto
+            self.latencia_ms = (time.monotonic() - instante) * 1e3
+            self._sobreposicao = (bbox, status)
+
+            self.resultado_reconhecimento_signal.emit((id_rec, nivel_max, status))
+
+
+            if status == "ACESSO CONCEDIDO":
+                self.acesso_finalizado = True
+                self.stop()
+            elif "NEGADO" in status:
+                self.acesso_finalizado = True
+                self.stop()
+
+        self.pipeline.parar()
+        for metricas in self.pipeline.metricas():
+            print("Pipeline {estagio}: {processados} itens, {erros} erros, {descartados} descartados na saída, "
+                  "serviço médio {servico_ms_medio:.1f} ms (p95 {servico_ms_p95:.1f} ms), "
+                  "fila média {fila_media:.2f} (máx. {fila_max})".format(**metricas))
+        print(f"Pipeline: {self.pipeline.descartados} frames substituídos antes da detecção")
+        self.captura.parar()
+        print(f"Captura: {self.captura.lidos} frames lidos, {self.captura.descartados} descartados "
+              f"pelo reconhecimento")
+        if self.anel is not None:
+            self.recon_engine.encoder.anel = None
+            self.anel.destruir()
         cap.release()
 
+    def _exibir(self, frame):
+        """Chamado pela captura a cada frame: desenha o último resultado e envia para a tela."""
+        bbox, status = self._sobreposicao
+        frame = frame.copy()
+
+        if bbox:
+            x, y, w, h = bbox
+            cor = (0, 0, 255)
+
+            if status == "ACESSO CONCEDIDO":
+                cor = (0, 255, 0)  # Verde
+
+
+            cv2.rectangle(frame, (x, y), (x + w, y + h), cor, 2)
+            cv2.putText(frame, status, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, cor, 2)
+
+        self.change_pixmap_signal.emit(frame)
+
+    def _decisao_sequencial(self, id_rec, nivel_max, status, bbox, distancia):
+        """
+        Acumula a distância do frame (ultima_distancia do Reconhecedor) na DecisaoSequencial.
+        Enquanto a evidência não basta, o status é só de verificação (nem CONCEDIDO nem
+        NEGADO, a sessão continua). Sem distância nova (frame sem comparação ou só com
+        encodings do cache), nada entra no teste e o status do frame nunca é terminal.
+        """
+        if distancia is None:
+            if status == "ACESSO CONCEDIDO" or "NEGADO" in status:
+                return id_rec, nivel_max, f"Verificando ({self.decisao.frames} frames)"
+            return id_rec, nivel_max, status
+
+        veredito = self.decisao.adicionar(distancia)
+        if veredito is None:
+            return id_rec, nivel_max, f"Verificando ({self.decisao.frames} frames)"
+
+        self.frames_consumidos = self.decisao.frames
+        print(f"Decisão sequencial: {veredito} após {self.frames_consumidos} frames")
+        if veredito == ACEITAR:
+            return self.recon_engine.decidir_identidade_confirmada(self.nivel_desejado, self.id_esperado, bbox)[:3]
+        return "Desconhecido", 0, "ACESSO NEGADO: Usuário Incorreto"
+
+    def _decisao_fusao(self, status, bbox):
+        """Mantém a sessão em verificação até a trilha da face reportada reunir AMOSTRAS_FUSAO encodings."""
+        if status != "ACESSO CONCEDIDO" and "NEGADO" not in status:
+            return status
+
+        amostras = max((self.fusao.amostras(t) for t in self.trilhas if t.bbox == bbox), default=0)
+        if amostras < AMOSTRAS_FUSAO:
+            return f"Verificando ({amostras}/{AMOSTRAS_FUSAO} amostras)"
+
+        self.frames_consumidos = self.rastreador.frames
+        print(f"Decisão por fusão: {status} com {amostras} amostras após {self.frames_consumidos} frames")
+        return status
+
     def stop(self):
         """Método para parar o loop da thread de forma segura."""
         self._run_flag = False
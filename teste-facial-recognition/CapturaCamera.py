@@ -0,0 +1,89 @@
+import time
+import threading
+
+
+class CapturaCamera:
+    """
+    Lê a câmera continuamente em uma thread própria, no ritmo da câmera, e guarda
+    só o frame mais recente (latest-frame-wins). O reconhecimento pega sempre o último
+    frame com ultimo(); os frames que chegam enquanto ele está ocupado são descartados,
+    em vez de se acumularem no buffer do driver.
+    ao_capturar: chamada com cada frame lido (ex.: exibição), independente do reconhecimento.
+    anel: AnelFrames; cada frame lido é gravado em um slot e entregue como view dele
+        (FrameAnel, com a sequência gravada; os processos de inferência leem o mesmo buffer,
+        sem cópia, e conferem essa sequência).
+    """
+
+    # Espera após uma leitura que falhou (câmera ainda iniciando, USB instável)
+    ESPERA_FALHA = 0.01
+
+    def __init__(self, captura, ao_capturar=None, anel=None):
+        """captura: objeto com read() -> (ret, frame), ex.: cv2.VideoCapture."""
+        self.captura = captura
+        self.ao_capturar = ao_capturar
+        self.anel = anel
+
+        self._condicao = threading.Condition()
+        self._frame = None
+        self._instante = 0.0
+        self._sequencia = 0
+        self._consumida = 0
+
+        self._rodando = False
+        self._thread = None
+
+        # Estatística
+        self.lidos = 0
+        self.descartados = 0
+        self.falhas = 0
+
+    def iniciar(self):
+        self._rodando = True
+        self._thread = threading.Thread(target=self._ler, name="CapturaCamera", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._rodando = False
+        with self._condicao:
+            self._condicao.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._frame = None
+
+    def _ler(self):
+        while self._rodando:
+            ret, frame = self.captura.read()
+            if not ret:
+                self.falhas += 1
+                time.sleep(self.ESPERA_FALHA)
+                continue
+            if self.anel is not None and frame.shape == self.anel.forma:
+                # A view leva a (slot, sequência) desta gravação até o EncoderRemoto
+                frame = self.anel.escrever(frame)[2]
+
+            with self._condicao:
+                # O frame anterior nunca foi entregue ao reconhecimento
+                if self._sequencia > self._consumida:
+                    self.descartados += 1
+                self._frame = frame
+                self._instante = time.monotonic()
+                self._sequencia += 1
+                self.lidos += 1
+                self._condicao.notify_all()
+
+            if self.ao_capturar is not None:
+                self.ao_capturar(frame)
+
+    def ultimo(self, apos=0, timeout=1.0):
+        """
+        Frame mais recente com sequência maior que 'apos' (espera até timeout segundos).
+        Retorna: (sequencia, frame, instante da leitura em time.monotonic()) ou None.
+        """
+        with self._condicao:
+            if not self._condicao.wait_for(lambda: self._sequencia > apos or not self._rodando, timeout):
+                return None
+            if self._sequencia <= apos:
+                return None
+            self._consumida = self._sequencia
+            return self._sequencia, self._frame, self._instante
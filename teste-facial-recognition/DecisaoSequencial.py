@@ -0,0 +1,70 @@
+import math
+
+# Decisão sequencial (teste da razão de probabilidades de Wald, SPRT) sobre a distância,
+# frame a frame, entre a face e a identidade declarada. Em vez de decidir no primeiro
+# frame, a evidência é acumulada e a sessão termina assim que ela basta para aceitar
+# ou rejeitar com as taxas de erro configuradas.
+
+ACEITAR = "ACEITAR"
+REJEITAR = "REJEITAR"
+
+
+class DecisaoSequencial:
+    """
+    Modelo: distância ~ Normal(media_genuina, desvio) quando a face é da identidade
+    declarada e ~ Normal(media_impostora, desvio) quando não é. Com desvios iguais, a
+    razão de log-verossimilhança de cada frame é linear na distância e vale zero no
+    ponto médio entre as duas médias.
+    alfa: taxa de falsa aceitação (impostor aceito); beta: taxa de falsa rejeição.
+    llr_maximo: limite da evidência de um único frame (um frame ruidoso não decide sozinho).
+    max_frames: sem decisão até aqui, a sessão é rejeitada.
+    As médias e o desvio padrão são proporcionais à tolerância do encoder
+    (0.45 / 0.75 / 0.1 para o ResNet do dlib, tolerância 0.6).
+    """
+
+    def __init__(self, tolerancia=0.6, alfa=0.01, beta=0.05, media_genuina=None, media_impostora=None,
+                 desvio=None, llr_maximo=2.5, max_frames=30):
+        self.media_genuina = 0.75 * tolerancia if media_genuina is None else media_genuina
+        self.media_impostora = 1.25 * tolerancia if media_impostora is None else media_impostora
+        self.desvio = tolerancia / 6.0 if desvio is None else desvio
+        self.llr_maximo = llr_maximo
+        self.max_frames = max_frames
+
+        # Limiares de Wald
+        self.limiar_aceitar = math.log((1.0 - beta) / alfa)
+        self.limiar_rejeitar = math.log(beta / (1.0 - alfa))
+
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Nova sessão."""
+        self.llr = 0.0
+        self.frames = 0
+        self.veredito = None
+
+    def razao_verossimilhanca(self, distancia):
+        """log p(d | genuína) - log p(d | impostora), limitado a ±llr_maximo."""
+        if distancia is None or not math.isfinite(distancia):
+            return -self.llr_maximo
+
+        ponto_medio = (self.media_genuina + self.media_impostora) / 2.0
+        inclinacao = (self.media_impostora - self.media_genuina) / (self.desvio ** 2)
+        llr = inclinacao * (ponto_medio - distancia)
+        return max(-self.llr_maximo, min(self.llr_maximo, llr))
+
+    def adicionar(self, distancia):
+        """
+        Acumula a distância de mais um frame (None/inf = a identidade declarada não
+        foi encontrada no frame). Retorna ACEITAR, REJEITAR ou None (evidência insuficiente).
+        """
+        if self.veredito is not None:
+            return self.veredito
+
+        self.frames += 1
+        self.llr += self.razao_verossimilhanca(distancia)
+
+        if self.llr >= self.limiar_aceitar:
+            self.veredito = ACEITAR
+        elif self.llr <= self.limiar_rejeitar or self.frames >= self.max_frames:
+            self.veredito = REJEITAR
+        return self.veredito
@@ -0,0 +1,152 @@
+import os
+import time
+import cv2
+import numpy as np
+
+try:
+    import face_recognition
+except ImportError:
+    face_recognition = None
+
+# Arquivos dos modelos que não vêm no pacote opencv-python (baixar para a pasta do projeto):
+#   LBP:   lbpcascade_frontalface_improved.xml (opencv/data/lbpcascades)
+#   YuNet: face_detection_yunet_2023mar.onnx   (opencv_zoo/models/face_detection_yunet)
+ARQUIVO_HAAR = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+ARQUIVO_LBP = "lbpcascade_frontalface_improved.xml"
+ARQUIVO_YUNET = "face_detection_yunet_2023mar.onnx"
+
+
+def _filtrar_tamanho(caixas, tamanho_min, tamanho_max):
+    """Mantém as caixas com largura dentro de [tamanho_min, tamanho_max]."""
+    if len(caixas) == 0:
+        return np.ones(0, dtype=bool)
+    largura = caixas[:, 2]
+    manter = largura >= tamanho_min
+    if tamanho_max:
+        manter &= largura <= tamanho_max
+    return manter
+
+
+class DetectorFace:
+    """
+    Interface dos detectores: detectar(frame BGR, tamanho_min, tamanho_max) ->
+    (caixas (n, 4) int32 em (x, y, w, h), landmarks (n, 5, 2) float32 ou None).
+    Cada chamada registra o tempo gasto (ultimo_tempo_ms, tempo_total_ms, chamadas).
+    usa_cor=False: o detector aceita (e prefere) a imagem já em cinza.
+    """
+
+    nome = ""
+    usa_cor = True
+
+    def __init__(self):
+        self.ultimo_tempo_ms = 0.0
+        self.tempo_total_ms = 0.0
+        self.chamadas = 0
+
+    def detectar(self, frame, tamanho_min=30, tamanho_max=None):
+        inicio = time.perf_counter()
+        caixas, landmarks = self._detectar(frame, tamanho_min, tamanho_max)
+        self.ultimo_tempo_ms = (time.perf_counter() - inicio) * 1e3
+        self.tempo_total_ms += self.ultimo_tempo_ms
+        self.chamadas += 1
+        return caixas, landmarks
+
+    def _detectar(self, frame, tamanho_min, tamanho_max):
+        raise NotImplementedError
+
+
+class DetectorCascade(DetectorFace):
+    """Cascata do OpenCV (Haar ou LBP) sobre a imagem em cinza."""
+
+    usa_cor = False
+
+    def __init__(self, arquivo=ARQUIVO_HAAR, nome="haar", scale_factor=1.1, min_neighbors=5):
+        super().__init__()
+        if not os.path.exists(arquivo):
+            raise FileNotFoundError(f"Cascata não encontrada: {arquivo}")
+        self.nome = nome
+        self.cascata = cv2.CascadeClassifier(arquivo)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def _detectar(self, frame, tamanho_min, tamanho_max):
+        cinza = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        limite = (tamanho_max, tamanho_max) if tamanho_max else (0, 0)
+        caixas = self.cascata.detectMultiScale(cinza, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                                               minSize=(tamanho_min, tamanho_min), maxSize=limite)
+        return np.asarray(caixas, dtype=np.int32).reshape(-1, 4), None
+
+
+class DetectorHOG(DetectorFace):
+    """HOG + SVM linear do dlib (face_recognition.face_locations, model='hog')."""
+
+    nome = "hog"
+
+    def __init__(self, upsample=1):
+        super().__init__()
+        if face_recognition is None:
+            raise ImportError("face_recognition não está instalado")
+        self.upsample = upsample
+
+    def _detectar(self, frame, tamanho_min, tamanho_max):
+        rgb = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        locais = face_recognition.face_locations(rgb, number_of_times_to_upsample=self.upsample, model="hog")
+        caixas = np.array([(left, top, right - left, bottom - top) for top, right, bottom, left in locais],
+                          dtype=np.int32).reshape(-1, 4)
+        return caixas[_filtrar_tamanho(caixas, tamanho_min, tamanho_max)], None
+
+
+class DetectorYuNet(DetectorFace):
+    """
+    YuNet (cv2.FaceDetectorYN, modelo ONNX na CPU).
+    Retorna também 5 landmarks por face: olhos, ponta do nariz e cantos da boca.
+    """
+
+    nome = "yunet"
+
+    def __init__(self, arquivo=ARQUIVO_YUNET, limiar_score=0.8, limiar_nms=0.3):
+        super().__init__()
+        if not hasattr(cv2, "FaceDetectorYN"):
+            raise ImportError("cv2.FaceDetectorYN requer OpenCV >= 4.5.4")
+        if not os.path.exists(arquivo):
+            raise FileNotFoundError(f"Modelo YuNet não encontrado: {arquivo}")
+        self._detector = cv2.FaceDetectorYN.create(arquivo, "", (320, 320), limiar_score, limiar_nms)
+        self._tamanho_entrada = (320, 320)
+
+    def _detectar(self, frame, tamanho_min, tamanho_max):
+        imagem = frame if frame.ndim == 3 else cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        tamanho = (imagem.shape[1], imagem.shape[0])
+        if tamanho != self._tamanho_entrada:
+            self._detector.setInputSize(tamanho)
+            self._tamanho_entrada = tamanho
+
+        _, faces = self._detector.detect(imagem)
+        if faces is None:
+            return np.empty((0, 4), dtype=np.int32), np.empty((0, 5, 2), dtype=np.float32)
+
+        caixas = np.round(faces[:, :4]).astype(np.int32)
+        landmarks = faces[:, 4:14].reshape(-1, 5, 2).astype(np.float32)
+        manter = _filtrar_tamanho(caixas, tamanho_min, tamanho_max)
+        return caixas[manter], landmarks[manter]
+
+
+BACKENDS_DETECTOR = {
+    "haar": lambda **p: DetectorCascade(ARQUIVO_HAAR, "haar", **p),
+    "lbp": lambda **p: DetectorCascade(p.pop("arquivo", ARQUIVO_LBP), "lbp", **p),
+    "hog": DetectorHOG,
+    "yunet": DetectorYuNet,
+}
+
+
+def criar_detector(backend="haar", **parametros):
+    """
+    Cria o detector pedido (uma instância de DetectorFace é devolvida como está, ex.: DetectorRemoto).
+    Se o modelo ou a dependência faltar, recai no Haar.
+    """
+    if isinstance(backend, DetectorFace):
+        return backend
+    try:
+        return BACKENDS_DETECTOR[backend](**parametros)
+    except (ImportError, FileNotFoundError) as erro:
+        print(f"⚠️ Detector '{backend}' indisponível ({erro}), usando Haar.")
+        return BACKENDS_DETECTOR["haar"]()
@@ -0,0 +1,241 @@
+import os
+import time
+import cv2
+import numpy as np
+
+try:
+    import dlib
+    import face_recognition
+    import face_recognition_models
+except ImportError:
+    dlib = None
+    face_recognition = None
+    face_recognition_models = None
+
+# Modelo SFace (opencv_zoo/models/face_recognition_sface), baixar para a pasta do projeto
+ARQUIVO_SFACE = "face_recognition_sface_2021dec.onnx"
+
+# Galerias antigas (sem etiqueta) foram geradas por face_recognition.face_encodings
+ESPACO_PADRAO = "dlib_resnet"
+
+
+class EncoderFace:
+    """
+    Interface dos encoders: codificar_lote(frames, caixas_por_frame, landmarks_por_frame)
+    -> lista (por frame) de listas de encodings.
+    landmarks_por_frame: por frame, None, um array (n, 5, 2) alinhado com as caixas ou uma
+    lista com um (5, 2) ou None por caixa (ex.: landmarks guardados nas trilhas).
+    nome: encoder que gerou os vetores; espaco: espaço de embedding (só vetores do mesmo
+    espaço podem ser comparados); tolerancia: limiar de distância euclidiana nesse espaço.
+    entrada_bgr: ordem de cores esperada nas imagens de cadastro (os frames da câmera já são BGR).
+    Cada chamada registra o tempo gasto (ultimo_tempo_ms, tempo_total_ms, faces).
+    """
+
+    nome = ""
+    espaco = ""
+    tolerancia = 0.6
+    entrada_bgr = False
+
+    def __init__(self):
+        self.ultimo_tempo_ms = 0.0
+        self.tempo_total_ms = 0.0
+        self.faces = 0
+
+    def codificar_lote(self, frames, caixas_por_frame, landmarks_por_frame=None):
+        inicio = time.perf_counter()
+        if landmarks_por_frame is None:
+            landmarks_por_frame = [None] * len(frames)
+        encodings = self._codificar_lote(frames, caixas_por_frame, landmarks_por_frame)
+        self.ultimo_tempo_ms = (time.perf_counter() - inicio) * 1e3
+        self.tempo_total_ms += self.ultimo_tempo_ms
+        self.faces += sum(len(e) for e in encodings)
+        return encodings
+
+    def codificar(self, frame, caixas, landmarks=None):
+        """Encodings das caixas (x, y, w, h) de um único frame."""
+        return self.codificar_lote([frame], [caixas], [landmarks])[0]
+
+    def _codificar_lote(self, frames, caixas_por_frame, landmarks_por_frame):
+        raise NotImplementedError
+
+
+class EncoderDlib(EncoderFace):
+    """
+    ResNet do dlib (o mesmo modelo do face_recognition.face_encodings).
+    modelo_landmarks="large": 68 pontos (padrão do face_recognition);
+    modelo_landmarks="small": 5 pontos, alinhamento mais barato no mesmo espaço de embedding.
+    Todas as faces de todos os frames saem de uma única chamada em lote ao compute_face_descriptor.
+    """
+
+    espaco = ESPACO_PADRAO
+    tolerancia = 0.6
+
+    def __init__(self, modelo_landmarks="large"):
+        super().__init__()
+        if face_recognition is None:
+            raise ImportError("face_recognition/dlib não estão instalados")
+        self.modelo_landmarks = modelo_landmarks
+        self.nome = "dlib68" if modelo_landmarks == "large" else "dlib5"
+
+    def _codificar_lote(self, frames, caixas_por_frame, landmarks_por_frame):
+        api = face_recognition.api
+        imagens, formas, posicoes = [], [], []
+        for i, (frame, caixas) in enumerate(zip(frames, caixas_por_frame)):
+            if len(caixas) == 0:
+                continue
+            face_rects = [(y, x + w, y + h, x) for (x, y, w, h) in caixas]
+            deteccoes = dlib.full_object_detections()
+            for landmarks in api._raw_face_landmarks(frame, face_rects, self.modelo_landmarks):
+                deteccoes.append(landmarks)
+
+            imagens.append(np.ascontiguousarray(frame))
+            formas.append(deteccoes)
+            posicoes.append(i)
+
+        encodings = [[] for _ in frames]
+        if imagens:
+            descritores = api.face_encoder.compute_face_descriptor(imagens, formas, 1)
+            for i, descritores_frame in zip(posicoes, descritores):
+                encodings[i] = [np.array(d) for d in descritores_frame]
+        return encodings
+
+
+# Modelos do dlib carregados uma única vez por processo e compartilhados entre encoders
+# (várias câmeras, cadastro e autenticação usam os mesmos objetos)
+_MODELOS_DLIB = {}
+
+
+def _modelo_dlib(nome):
+    if nome not in _MODELOS_DLIB:
+        if nome == "resnet":
+            modelo = dlib.face_recognition_model_v1(face_recognition_models.face_recognition_model_location())
+        elif nome == "large":
+            modelo = dlib.shape_predictor(face_recognition_models.pose_predictor_model_location())
+        else:
+            modelo = dlib.shape_predictor(face_recognition_models.pose_predictor_five_point_model_location())
+        _MODELOS_DLIB[nome] = modelo
+    return _MODELOS_DLIB[nome]
+
+
+class EncoderDlibDireto(EncoderFace):
+    """
+    Mesmo ResNet do EncoderDlib, chamando o dlib diretamente, sem o face_recognition.
+    O preditor de landmarks e a rede ficam carregados durante todo o processo.
+    Os chips alinhados (150x150, padding 0.25, como o compute_face_descriptor faz
+    internamente) são extraídos uma vez com get_face_chips, e todos os chips de
+    todos os frames passam pela rede em uma única chamada em lote. Os vetores são
+    os mesmos do EncoderDlib.
+    """
+
+    espaco = ESPACO_PADRAO
+    tolerancia = 0.6
+
+    TAMANHO_CHIP = 150
+    PADDING_CHIP = 0.25
+
+    def __init__(self, modelo_landmarks="large"):
+        super().__init__()
+        if face_recognition_models is None:
+            raise ImportError("dlib/face_recognition_models não estão instalados")
+        self.nome = "dlib68" if modelo_landmarks == "large" else "dlib5"
+        self.preditor = _modelo_dlib(modelo_landmarks)
+        self.resnet = _modelo_dlib("resnet")
+
+    def extrair_chips(self, frame, caixas):
+        """Chips alinhados (uint8, TAMANHO_CHIP x TAMANHO_CHIP x 3) das caixas (x, y, w, h)."""
+        formas = dlib.full_object_detections()
+        for (x, y, w, h) in caixas:
+            formas.append(self.preditor(frame, dlib.rectangle(int(x), int(y), int(x + w), int(y + h))))
+        if len(formas) == 0:
+            return []
+        return dlib.get_face_chips(frame, formas, size=self.TAMANHO_CHIP, padding=self.PADDING_CHIP)
+
+    def _codificar_lote(self, frames, caixas_por_frame, landmarks_por_frame):
+        chips, contagens = [], []
+        for frame, caixas in zip(frames, caixas_por_frame):
+            chips_frame = self.extrair_chips(np.ascontiguousarray(frame), caixas) if len(caixas) else []
+            chips.extend(chips_frame)
+            contagens.append(len(chips_frame))
+
+        descritores = [np.array(d) for d in self.resnet.compute_face_descriptor(chips)] if chips else []
+        encodings, inicio = [], 0
+        for quantidade in contagens:
+            encodings.append(descritores[inicio:inicio + quantidade])
+            inicio += quantidade
+        return encodings
+
+
+class EncoderSFace(EncoderFace):
+    """
+    SFace (cv2.FaceRecognizerSF, modelo ONNX na CPU).
+    Alinha a face pelos 5 landmarks do YuNet; sem landmarks (ex.: Haar), usa o recorte
+    da caixa redimensionado, com acurácia menor. Os vetores são normalizados (norma 1),
+    então a distância euclidiana equivale ao cosseno: o limiar 0.363 de similaridade
+    do SFace vira sqrt(2 - 2 * 0.363) ~ 1.128.
+    """
+
+    nome = "sface"
+    espaco = "sface"
+    tolerancia = 1.128
+    entrada_bgr = True
+
+    TAMANHO_ENTRADA = (112, 112)
+
+    def __init__(self, arquivo=ARQUIVO_SFACE):
+        super().__init__()
+        if not hasattr(cv2, "FaceRecognizerSF"):
+            raise ImportError("cv2.FaceRecognizerSF requer OpenCV >= 4.5.4")
+        if not os.path.exists(arquivo):
+            raise FileNotFoundError(f"Modelo SFace não encontrado: {arquivo}")
+        self._modelo = cv2.FaceRecognizerSF.create(arquivo, "")
+
+    def _codificar_lote(self, frames, caixas_por_frame, landmarks_por_frame):
+        encodings = []
+        for frame, caixas, landmarks in zip(frames, caixas_por_frame, landmarks_por_frame):
+            encodings_frame = []
+            for j, (x, y, w, h) in enumerate(caixas):
+                if landmarks is not None and j < len(landmarks) and landmarks[j] is not None:
+                    linha = np.concatenate([[x, y, w, h], np.ravel(landmarks[j]), [1.0]]).astype(np.float32)
+                    face = self._modelo.alignCrop(frame, linha)
+                else:
+                    recorte = frame[max(y, 0):y + h, max(x, 0):x + w]
+                    face = cv2.resize(recorte, self.TAMANHO_ENTRADA)
+
+                vetor = self._modelo.feature(face).ravel().astype(np.float64)
+                encodings_frame.append(vetor / max(np.linalg.norm(vetor), 1e-12))
+            encodings.append(encodings_frame)
+        return encodings
+
+
+BACKENDS_ENCODER = {
+    "dlib68": lambda **p: EncoderDlib("large", **p),
+    "dlib5": lambda **p: EncoderDlib("small", **p),
+    "dlib68_direto": lambda **p: EncoderDlibDireto("large", **p),
+    "dlib5_direto": lambda **p: EncoderDlibDireto("small", **p),
+    "sface": EncoderSFace,
+}
+
+
+def criar_encoder(backend="dlib68", **parametros):
+    """
+    Cria o encoder pedido (uma instância de EncoderFace é devolvida como está, ex.: EncoderRemoto).
+    Não há fallback: trocar de encoder muda o espaço de embedding e a galeria deixaria de ser comparável.
+    """
+    if isinstance(backend, EncoderFace):
+        return backend
+    return BACKENDS_ENCODER[backend](**parametros)
+
+
+def etiqueta_encoder(dados):
+    """Chaves que identificam o encoder da galeria (para copiar em galerias derivadas)."""
+    return {chave: dados[chave] for chave in ("encoder", "espaco") if chave in dados}
+
+
+def verificar_espaco(dados, encoder):
+    """Garante que a galeria foi gerada no mesmo espaço de embedding do encoder."""
+    espaco = dados.get("espaco", ESPACO_PADRAO)
+    if espaco != encoder.espaco:
+        raise ValueError(
+            f"Galeria gerada com '{dados.get('encoder', espaco)}' (espaço '{espaco}') não pode ser "
+            f"comparada com o encoder '{encoder.nome}' (espaço '{encoder.espaco}')."
+        )
@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+
+
+class FusaoEmbeddings:
+    """
+    Média ponderada por qualidade dos encodings de uma mesma trilha (id do RastreadorFaces).
+    Cada encoding novo da trilha entra com peso = confiança da trilha x nitidez x tamanho
+    da face; o template fundido é comparado com a galeria no lugar do encoding do frame,
+    com distância mais estável que a de um frame isolado.
+    nitidez_referencia: variância do Laplaciano (recorte 64x64) a partir da qual a face
+        é considerada nítida; tamanho_referencia: largura (px) de uma face bem enquadrada.
+    max_amostras: só as últimas amostras entram na média (a face pode mudar de pose/luz).
+    """
+
+    TAMANHO_RECORTE = (64, 64)
+
+    def __init__(self, nitidez_referencia=100.0, tamanho_referencia=100, max_amostras=10):
+        self.nitidez_referencia = nitidez_referencia
+        self.tamanho_referencia = tamanho_referencia
+        self.max_amostras = max_amostras
+
+        # id da trilha -> lista de (encoding, peso)
+        self._amostras = {}
+
+    def __len__(self):
+        return len(self._amostras)
+
+    def limpar(self):
+        self._amostras.clear()
+
+    def qualidade(self, frame, trilha):
+        """Peso (0, 1] do encoding da trilha neste frame."""
+        x, y, w, h = trilha.bbox
+        recorte = frame[max(y, 0):y + h, max(x, 0):x + w]
+        if recorte.size == 0:
+            return 1e-3
+
+        cinza = recorte if recorte.ndim == 2 else cv2.cvtColor(recorte, cv2.COLOR_BGR2GRAY)
+        cinza = cv2.resize(cinza, self.TAMANHO_RECORTE, interpolation=cv2.INTER_AREA)
+        nitidez = min(1.0, cv2.Laplacian(cinza, cv2.CV_64F).var() / self.nitidez_referencia)
+        tamanho = min(1.0, w / float(self.tamanho_referencia))
+        return max(1e-3, trilha.confianca * nitidez * tamanho)
+
+    def adicionar(self, trilha, encoding, peso=1.0):
+        amostras = self._amostras.setdefault(trilha.id, [])
+        amostras.append((np.asarray(encoding, dtype=np.float64), float(peso)))
+        if len(amostras) > self.max_amostras:
+            del amostras[0]
+
+    def obter(self, trilha):
+        """Template fundido da trilha, ou None se ainda não houver amostras."""
+        amostras = self._amostras.get(trilha.id)
+        if not amostras:
+            return None
+        encodings = np.array([e for e, _ in amostras])
+        pesos = np.array([p for _, p in amostras])
+        return pesos @ encodings / pesos.sum()
+
+    def amostras(self, trilha):
+        """Quantidade de encodings já fundidos na trilha."""
+        return len(self._amostras.get(trilha.id, ()))
+
+    def descartar_ausentes(self, trilhas):
+        """Remove as trilhas que não estão mais ativas."""
+        ativas = {t.id for t in trilhas}
+        for id_trilha in [i for i in self._amostras if i not in ativas]:
+            del self._amostras[id_trilha]
@@ -0,0 +1,77 @@
+import os
+import pickle
+import numpy as np
+
+# Arquivos de galeria compacta (PQ, int8, float16):
+#  - um PKL com o campo "formato", ids, níveis e a representação compacta;
+#  - um .npy com os vetores float32, aberto em memmap e usado só no re-ranking exato.
+# Os templates são gravados agrupados por identidade, na mesma ordem usada pelo
+# MatcherGaleria, para que o matcher use o memmap sem copiar os vetores.
+
+
+def agrupar_por_identidade(dados):
+    """Retorna os dados reordenados por identidade, com os encodings em float32 contíguo."""
+    chaves = np.array([str(i).lower() for i in dados["ids"]])
+    ordem = np.argsort(chaves, kind="stable")
+
+    return {
+        "encodings": np.ascontiguousarray(np.asarray(dados["encodings"], dtype=np.float32)[ordem]),
+        "ids": [dados["ids"][i] for i in ordem],
+        "niveis_acesso": [dados["niveis_acesso"][i] for i in ordem],
+    }
+
+
+def gravar_galeria_compacta(dados_compactos, matriz, caminho_saida):
+    """Grava o PKL da galeria compacta e o .npy com os vetores float32 ao lado dele."""
+    caminho_vetores = os.path.splitext(caminho_saida)[0] + "_vetores.npy"
+    np.save(caminho_vetores, matriz)
+
+    # Relativo ao PKL, para a galeria poder ser movida de pasta
+    dados_compactos["arquivo_vetores"] = os.path.basename(caminho_vetores)
+    with open(caminho_saida, 'wb') as f:
+        pickle.dump(dados_compactos, f)
+    return dados_compactos
+
+
+def abrir_galeria_compacta(dados, caminho_pkl):
+    """Associa aos dados os vetores originais em memmap (somente leitura) como 'encodings'."""
+    caminho_vetores = os.path.join(os.path.dirname(caminho_pkl), dados["arquivo_vetores"])
+    dados["encodings"] = np.load(caminho_vetores, mmap_mode="r")
+    return dados
+
+
+def _mais_proximos(aproximadas, n):
+    """Posições dos n menores valores, em ordem crescente (leitura sequencial do memmap)."""
+    n = min(len(aproximadas), n)
+    candidatos = np.argpartition(aproximadas, n - 1)[:n]
+    candidatos.sort()
+    return candidatos
+
+
+def verificar_compacta(galeria, encoding, inicio, fim, tolerancia, checar_impostor=True):
+    """
+    Verificação 1:1 sobre uma galeria compacta (GaleriaPQ ou GaleriaQuantizada), no mesmo
+    critério de MatcherGaleria.verificar. A varredura grosseira lê só os códigos; os
+    n_reranking candidatos da fatia declarada [inicio, fim) e, se ela aceitar, os
+    n_reranking candidatos das demais identidades são reavaliados em float32 (memmap).
+    Retorna: indice (int), distancia (float), match (bool).
+    """
+    probe = np.asarray(encoding, dtype=np.float32)
+    aproximadas = galeria.distancias_aproximadas(probe)
+
+    candidatos = _mais_proximos(aproximadas[inicio:fim], galeria.n_reranking) + inicio
+    exatas = np.linalg.norm(np.asarray(galeria.vetores[candidatos], dtype=np.float32) - probe, axis=1)
+    posicao = int(np.argmin(exatas))
+    indice, distancia = int(candidatos[posicao]), float(exatas[posicao])
+    if distancia > tolerancia or not checar_impostor:
+        return indice, distancia, distancia <= tolerancia
+
+    # Impostores: os mais próximos fora da fatia, pela distância aproximada
+    aproximadas[inicio:fim] = np.inf
+    impostores = _mais_proximos(aproximadas, galeria.n_reranking)
+    impostores = impostores[np.isfinite(aproximadas[impostores])]
+    if len(impostores):
+        exatas = np.linalg.norm(np.asarray(galeria.vetores[impostores], dtype=np.float32) - probe, axis=1)
+        if np.any(exatas < distancia):
+            return indice, distancia, False
+    return indice, distancia, True
@@ -0,0 +1,122 @@
+import numpy as np
+
+from IndiceANN import treinar_kmeans, atribuir_centroides
+from GaleriaCompacta import agrupar_por_identidade, gravar_galeria_compacta, verificar_compacta
+from EncodersFace import etiqueta_encoder
+
+
+class GaleriaPQ:
+    """
+    Galeria comprimida por Product Quantization.
+    Cada template de 128 dimensões vira n_subespacos bytes (um código por subespaço).
+    A busca usa distância assimétrica (ADC): a consulta fica em float32 e a distância
+    aproximada é a soma de uma tabela pré-calculada por consulta. Os n_reranking
+    melhores candidatos são reavaliados com os vetores originais, lidos do disco (memmap).
+    """
+
+    formato = "pq"
+
+    def __init__(self, codebooks, codigos, vetores, n_reranking=32):
+        self.codebooks = np.ascontiguousarray(codebooks, dtype=np.float32)  # (m, ksub, dsub)
+        # Guardado como (m, n): cada subespaço é uma linha contígua na soma das tabelas
+        self.codigos = np.ascontiguousarray(codigos, dtype=np.uint8)
+        self.vetores = vetores
+        self.n_reranking = n_reranking
+
+    def __len__(self):
+        return self.codigos.shape[1]
+
+    @property
+    def n_subespacos(self):
+        return self.codebooks.shape[0]
+
+    @staticmethod
+    def treinar_codebooks(matriz, n_subespacos=16, n_centroides=256, iteracoes=10, semente=0):
+        """Um k-means independente por subespaço."""
+        n, dim = matriz.shape
+        if dim % n_subespacos != 0:
+            raise ValueError(f"Dimensão {dim} não é divisível por {n_subespacos} subespaços")
+
+        dsub = dim // n_subespacos
+        n_centroides = min(n_centroides, 256, n)
+        codebooks = np.empty((n_subespacos, n_centroides, dsub), dtype=np.float32)
+        for j in range(n_subespacos):
+            sub = np.ascontiguousarray(matriz[:, j * dsub:(j + 1) * dsub])
+            codebooks[j] = treinar_kmeans(sub, n_centroides, iteracoes, semente + j)
+        return codebooks
+
+    @staticmethod
+    def codificar(matriz, codebooks):
+        """Retorna os códigos no formato (m, n) uint8."""
+        n_subespacos, _, dsub = codebooks.shape
+        codigos = np.empty((n_subespacos, len(matriz)), dtype=np.uint8)
+        for j in range(n_subespacos):
+            sub = np.ascontiguousarray(matriz[:, j * dsub:(j + 1) * dsub])
+            codigos[j] = atribuir_centroides(sub, codebooks[j])
+        return codigos
+
+    def tabela_distancias(self, probe):
+        """Distância ao quadrado de cada sub-vetor da consulta a cada centróide: (m, ksub)."""
+        n_subespacos, _, dsub = self.codebooks.shape
+        sub = probe.reshape(n_subespacos, 1, dsub)
+        return np.sum((self.codebooks - sub) ** 2, axis=2)
+
+    def distancias_aproximadas(self, encoding):
+        """Distância ADC (ao quadrado) para todos os templates."""
+        probe = np.asarray(encoding, dtype=np.float32)
+        tabela = self.tabela_distancias(probe)
+
+        aproximadas = tabela[0][self.codigos[0]]
+        for j in range(1, self.n_subespacos):
+            aproximadas += tabela[j][self.codigos[j]]
+        return aproximadas
+
+    def buscar(self, encoding, k=1):
+        """
+        ADC sobre os códigos + re-ranking exato dos melhores candidatos.
+        Retorna: indices (np.ndarray), distancias (np.ndarray), ordenados do mais próximo.
+        """
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        probe = np.asarray(encoding, dtype=np.float32)
+        aproximadas = self.distancias_aproximadas(probe)
+
+        n_candidatos = min(len(self), max(k, self.n_reranking))
+        candidatos = np.argpartition(aproximadas, n_candidatos - 1)[:n_candidatos]
+        # Ordem crescente = leitura sequencial do memmap
+        candidatos.sort()
+
+        exatas = np.linalg.norm(np.asarray(self.vetores[candidatos], dtype=np.float32) - probe, axis=1)
+        melhores = np.argsort(exatas, kind="stable")[:k]
+        return candidatos[melhores], exatas[melhores]
+
+    def verificar(self, encoding, inicio, fim, tolerancia, checar_impostor=True):
+        """Verificação 1:1 contra as linhas [inicio, fim) (ver verificar_compacta)."""
+        return verificar_compacta(self, encoding, inicio, fim, tolerancia, checar_impostor)
+
+    def bytes_em_memoria(self):
+        """Memória residente da galeria (códigos + codebooks); os vetores ficam em disco."""
+        return self.codigos.nbytes + self.codebooks.nbytes
+
+    @classmethod
+    def de_dados(cls, dados):
+        """Cria a galeria a partir do dicionário carregado por abrir_galeria_compacta()."""
+        return cls(dados["codebooks"], dados["codigos"], dados["encodings"])
+
+
+def converter_para_pq(dados, caminho_saida, n_subespacos=16, n_centroides=256):
+    """Grava uma galeria PQ a partir dos dados do dados_biometricos.pkl."""
+    agrupados = agrupar_por_identidade(dados)
+    matriz = agrupados["encodings"]
+    codebooks = GaleriaPQ.treinar_codebooks(matriz, n_subespacos, n_centroides)
+
+    dados_pq = {
+        "formato": GaleriaPQ.formato,
+        "ids": agrupados["ids"],
+        "niveis_acesso": agrupados["niveis_acesso"],
+        **etiqueta_encoder(dados),
+        "codebooks": codebooks,
+        "codigos": GaleriaPQ.codificar(matriz, codebooks),
+    }
+    return gravar_galeria_compacta(dados_pq, matriz, caminho_saida)
@@ -0,0 +1,121 @@
+import numpy as np
+
+from GaleriaCompacta import agrupar_por_identidade, gravar_galeria_compacta, verificar_compacta
+from EncodersFace import etiqueta_encoder
+
+
+class GaleriaQuantizada:
+    """
+    Galeria em int8 (escala por dimensão) ou float16.
+    A varredura grosseira lê só a matriz compacta (1 ou 2 bytes por dimensão), em blocos
+    convertidos para float32 dentro da cache; os n_reranking templates mais próximos
+    são reavaliados em float32 com os vetores originais (memmap).
+    """
+
+    # Linhas convertidas por vez: 1024 x 128 x 4 bytes = 512 KB, cabe na cache L2
+    BLOCO = 1024
+
+    def __init__(self, formato, codigos, deslocamento, escala, vetores, n_reranking=16):
+        self.formato = formato
+        self.codigos = np.ascontiguousarray(codigos)
+        self.deslocamento = np.asarray(deslocamento, dtype=np.float32)
+        self.escala = np.asarray(escala, dtype=np.float32)
+        self.vetores = vetores
+        self.n_reranking = n_reranking
+
+        # Distância no espaço quantizado ponderada por escala² (int8); no float16 a escala é 1
+        self.pesos = self.escala ** 2
+        self.normas_quadradas = np.empty(len(self.codigos), dtype=np.float32)
+        for inicio in range(0, len(self.codigos), self.BLOCO):
+            bloco = self.codigos[inicio:inicio + self.BLOCO].astype(np.float32)
+            self.normas_quadradas[inicio:inicio + self.BLOCO] = (bloco * bloco) @ self.pesos
+
+    def __len__(self):
+        return len(self.codigos)
+
+    @staticmethod
+    def quantizar(matriz, formato):
+        """Retorna: codigos, deslocamento, escala (por dimensão)."""
+        if formato == "float16":
+            dim = matriz.shape[1]
+            return matriz.astype(np.float16), np.zeros(dim, np.float32), np.ones(dim, np.float32)
+
+        minimos = matriz.min(axis=0) if len(matriz) else np.zeros(matriz.shape[1], np.float32)
+        maximos = matriz.max(axis=0) if len(matriz) else np.zeros(matriz.shape[1], np.float32)
+        deslocamento = (maximos + minimos) / 2.0
+        # Dimensões constantes recebem escala 1 para evitar divisão por zero
+        escala = np.where(maximos > minimos, (maximos - minimos) / 254.0, 1.0).astype(np.float32)
+
+        codigos = np.clip(np.rint((matriz - deslocamento) / escala), -127, 127).astype(np.int8)
+        return codigos, deslocamento.astype(np.float32), escala
+
+    def distancias_aproximadas(self, encoding):
+        """Distância (ao quadrado) calculada sobre a matriz compacta, bloco a bloco."""
+        probe = (np.asarray(encoding, dtype=np.float32) - self.deslocamento) / self.escala
+        probe_ponderado = probe * self.pesos
+        constante = np.dot(probe, probe_ponderado)
+
+        aproximadas = np.empty(len(self), dtype=np.float32)
+        # Buffer reaproveitado entre blocos: a conversão para float32 não sai da cache
+        buffer = np.empty((self.BLOCO, self.codigos.shape[1]), dtype=np.float32)
+        for inicio in range(0, len(self), self.BLOCO):
+            bloco = self.codigos[inicio:inicio + self.BLOCO]
+            convertido = buffer[:len(bloco)]
+            np.copyto(convertido, bloco)
+            np.dot(convertido, probe_ponderado, out=aproximadas[inicio:inicio + len(bloco)])
+
+        aproximadas *= -2.0
+        aproximadas += self.normas_quadradas
+        aproximadas += constante
+        return aproximadas
+
+    def buscar(self, encoding, k=1):
+        """
+        Varredura compacta + re-ranking float32 dos n_reranking melhores.
+        Retorna: indices (np.ndarray), distancias (np.ndarray), ordenados do mais próximo.
+        """
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        probe = np.asarray(encoding, dtype=np.float32)
+        aproximadas = self.distancias_aproximadas(probe)
+
+        n_candidatos = min(len(self), max(k, self.n_reranking))
+        candidatos = np.argpartition(aproximadas, n_candidatos - 1)[:n_candidatos]
+        # Ordem crescente = leitura sequencial do memmap
+        candidatos.sort()
+
+        exatas = np.linalg.norm(np.asarray(self.vetores[candidatos], dtype=np.float32) - probe, axis=1)
+        melhores = np.argsort(exatas, kind="stable")[:k]
+        return candidatos[melhores], exatas[melhores]
+
+    def verificar(self, encoding, inicio, fim, tolerancia, checar_impostor=True):
+        """Verificação 1:1 contra as linhas [inicio, fim) (ver verificar_compacta)."""
+        return verificar_compacta(self, encoding, inicio, fim, tolerancia, checar_impostor)
+
+    def bytes_em_memoria(self):
+        """Memória residente da galeria compacta; os vetores float32 ficam em disco."""
+        return self.codigos.nbytes + self.normas_quadradas.nbytes
+
+    @classmethod
+    def de_dados(cls, dados):
+        """Cria a galeria a partir do dicionário carregado por abrir_galeria_compacta()."""
+        return cls(dados["formato"], dados["codigos"], dados["deslocamento"], dados["escala"], dados["encodings"])
+
+
+def converter_para_quantizada(dados, caminho_saida, formato="int8"):
+    """Grava uma galeria int8/float16 a partir dos dados do dados_biometricos.pkl."""
+    agrupados = agrupar_por_identidade(dados)
+    matriz = agrupados["encodings"]
+    codigos, deslocamento, escala = GaleriaQuantizada.quantizar(matriz, formato)
+
+    dados_quantizados = {
+        "formato": formato,
+        "ids": agrupados["ids"],
+        "niveis_acesso": agrupados["niveis_acesso"],
+        **etiqueta_encoder(dados),
+        "codigos": codigos,
+        "deslocamento": deslocamento,
+        "escala": escala,
+    }
+    return gravar_galeria_compacta(dados_quantizados, matriz, caminho_saida)
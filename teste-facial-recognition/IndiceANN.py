@@ -0,0 +1,312 @@
+import pickle
+import hashlib
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+def impressao_galeria(matriz, ids):
+    """
+    Impressão digital da galeria (templates + identidades, na ordem das linhas).
+    Gravada junto com o índice: as linhas do índice só valem para a mesma galeria.
+    """
+    resumo = hashlib.sha1(np.ascontiguousarray(matriz, dtype=np.float32).tobytes())
+    resumo.update("\n".join(str(i) for i in ids).encode("utf-8"))
+    return resumo.hexdigest()
+
+
+def _distancias_quadradas(matriz, normas_quadradas, probe):
+    """||g - p||² para todas as linhas de matriz, com normas pré-calculadas."""
+    quadrados = normas_quadradas + np.dot(probe, probe) - 2.0 * (matriz @ probe)
+    np.maximum(quadrados, 0.0, out=quadrados)
+    return quadrados
+
+
+def _menores_k(distancias, indices, k):
+    """Seleciona os k menores (ordenados) sem ordenar o vetor inteiro."""
+    k = min(k, len(distancias))
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    candidatos = np.argpartition(distancias, k - 1)[:k]
+    candidatos = candidatos[np.argsort(distancias[candidatos], kind="stable")]
+    return indices[candidatos], distancias[candidatos]
+
+
+def atribuir_centroides(matriz, centroides, bloco=8192):
+    """Centróide mais próximo de cada linha, em blocos para limitar a memória."""
+    normas_centroides = np.einsum("ij,ij->i", centroides, centroides)
+    atribuicoes = np.empty(len(matriz), dtype=np.int64)
+    for inicio in range(0, len(matriz), bloco):
+        parte = matriz[inicio:inicio + bloco]
+        # ||p||² é constante por linha e não altera o argmin
+        atribuicoes[inicio:inicio + bloco] = np.argmin(normas_centroides - 2.0 * (parte @ centroides.T), axis=1)
+    return atribuicoes
+
+
+def treinar_kmeans(matriz, n_centroides, iteracoes=10, semente=0):
+    """k-means de Lloyd sobre uma amostra da matriz."""
+    rng = np.random.default_rng(semente)
+    tamanho_amostra = min(len(matriz), max(40 * n_centroides, 10000))
+    amostra = matriz[rng.choice(len(matriz), tamanho_amostra, replace=False)]
+
+    centroides = amostra[rng.choice(len(amostra), n_centroides, replace=False)].copy()
+    for _ in range(iteracoes):
+        atribuicoes = atribuir_centroides(amostra, centroides)
+        somas = np.zeros_like(centroides)
+        np.add.at(somas, atribuicoes, amostra)
+        contagens = np.bincount(atribuicoes, minlength=n_centroides)
+
+        # Centróides sem pontos mantêm a posição anterior
+        ocupados = contagens > 0
+        centroides[ocupados] = somas[ocupados] / contagens[ocupados, None]
+    return centroides
+
+
+class IndiceIVF:
+    """
+    Índice invertido (IVF) em NumPy puro.
+    Os templates são agrupados por k-means em listas; a busca avalia apenas as
+    n_sondas listas mais próximas da consulta. n_sondas é o ajuste recall x latência.
+    """
+
+    backend = "ivf"
+
+    # Inserções ficam num buffer avaliado por força bruta até serem reempacotadas
+    LIMITE_PENDENTES = 4096
+
+    def __init__(self, n_listas=None, n_sondas=8, iteracoes_kmeans=10, semente=0):
+        self.n_listas = n_listas
+        self.n_sondas = n_sondas
+        self.iteracoes_kmeans = iteracoes_kmeans
+        self.semente = semente
+        # impressao_galeria() da galeria indexada (conferida ao carregar)
+        self.galeria = None
+
+        self.centroides = None
+        self.matriz = None
+        self.normas_quadradas = None
+        self.indices = None
+        self.inicios = None
+
+        self._pendentes = []
+        self._indices_pendentes = []
+
+    def __len__(self):
+        empacotados = 0 if self.indices is None else len(self.indices)
+        return empacotados + sum(len(p) for p in self._indices_pendentes)
+
+    def construir(self, encodings, indices=None):
+        """Treina os centróides (k-means) e distribui os templates nas listas."""
+        matriz = np.ascontiguousarray(encodings, dtype=np.float32)
+        if indices is None:
+            indices = np.arange(len(matriz))
+        indices = np.asarray(indices, dtype=np.int64)
+
+        self._pendentes = []
+        self._indices_pendentes = []
+
+        if len(matriz) == 0:
+            # Sem dados para treinar: tudo fica pendente até a primeira inserção
+            self.centroides = None
+            self._pendentes = [matriz]
+            self._indices_pendentes = [indices]
+            return self
+
+        n_listas = self.n_listas or max(1, int(4 * np.sqrt(len(matriz))))
+        self.n_listas = min(n_listas, len(matriz))
+
+        self.centroides = treinar_kmeans(matriz, self.n_listas, self.iteracoes_kmeans, self.semente)
+        self._empacotar(matriz, indices)
+        return self
+
+    def inserir(self, encodings, indices=None):
+        """Inserção incremental; os centróides existentes não são re-treinados."""
+        novos = np.ascontiguousarray(np.atleast_2d(encodings), dtype=np.float32)
+        if indices is None:
+            indices = np.arange(len(self), len(self) + len(novos))
+
+        self._pendentes.append(novos)
+        self._indices_pendentes.append(np.asarray(indices, dtype=np.int64))
+
+        if sum(len(p) for p in self._pendentes) >= self.LIMITE_PENDENTES:
+            self._reempacotar()
+
+    def buscar(self, encoding, k=1):
+        """
+        Retorna os k vizinhos aproximados.
+        Retorna: indices (np.ndarray), distancias (np.ndarray), ordenados do mais próximo.
+        """
+        probe = np.asarray(encoding, dtype=np.float32)
+        partes_dist = []
+        partes_idx = []
+
+        if self.centroides is not None and len(self.centroides) > 0:
+            dist_centroides = np.sum((self.centroides - probe) ** 2, axis=1)
+            n_sondas = min(self.n_sondas, len(self.centroides))
+            sondas = np.argpartition(dist_centroides, n_sondas - 1)[:n_sondas]
+
+            for lista in sondas:
+                inicio, fim = self.inicios[lista], self.inicios[lista + 1]
+                if fim > inicio:
+                    partes_dist.append(_distancias_quadradas(
+                        self.matriz[inicio:fim], self.normas_quadradas[inicio:fim], probe))
+                    partes_idx.append(self.indices[inicio:fim])
+
+        for pendente, indices in zip(self._pendentes, self._indices_pendentes):
+            partes_dist.append(np.sum((pendente - probe) ** 2, axis=1))
+            partes_idx.append(indices)
+
+        if not partes_dist:
+            return _menores_k(np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64), k)
+
+        indices, quadrados = _menores_k(np.concatenate(partes_dist), np.concatenate(partes_idx), k)
+        return indices, np.sqrt(quadrados)
+
+    def salvar(self, caminho):
+        self._reempacotar()
+        estado = {
+            "backend": self.backend,
+            "n_listas": self.n_listas,
+            "n_sondas": self.n_sondas,
+            "galeria": self.galeria,
+            "centroides": self.centroides,
+            "matriz": self.matriz,
+            "indices": self.indices,
+            "inicios": self.inicios,
+        }
+        with open(caminho, 'wb') as f:
+            pickle.dump(estado, f)
+
+    @classmethod
+    def _de_estado(cls, estado):
+        indice = cls(n_listas=estado["n_listas"], n_sondas=estado["n_sondas"])
+        indice.galeria = estado.get("galeria")
+        indice.centroides = estado["centroides"]
+        indice.matriz = estado["matriz"]
+        indice.indices = estado["indices"]
+        indice.inicios = estado["inicios"]
+        if indice.matriz is not None:
+            indice.normas_quadradas = np.einsum("ij,ij->i", indice.matriz, indice.matriz)
+        return indice
+
+    def _empacotar(self, matriz, indices):
+        """Ordena os templates por lista para que cada lista seja uma fatia contígua."""
+        atribuicoes = atribuir_centroides(matriz, self.centroides)
+        ordem = np.argsort(atribuicoes, kind="stable")
+
+        self.matriz = np.ascontiguousarray(matriz[ordem])
+        self.normas_quadradas = np.einsum("ij,ij->i", self.matriz, self.matriz)
+        self.indices = indices[ordem]
+        self.inicios = np.r_[0, np.cumsum(np.bincount(atribuicoes, minlength=self.n_listas))]
+
+    def _reempacotar(self):
+        if not self._pendentes:
+            return
+
+        if self.centroides is None:
+            # Índice criado com galeria vazia: treina agora com o que foi inserido
+            self.construir(np.concatenate(self._pendentes), np.concatenate(self._indices_pendentes))
+            return
+
+        matriz = np.concatenate([self.matriz] + self._pendentes)
+        indices = np.concatenate([self.indices] + self._indices_pendentes)
+        self._pendentes = []
+        self._indices_pendentes = []
+        self._empacotar(matriz, indices)
+
+
+class IndiceHNSW:
+    """
+    Grafo HNSW via hnswlib (dependência opcional).
+    ef_busca é o ajuste recall x latência.
+    """
+
+    backend = "hnsw"
+
+    def __init__(self, ef_busca=64, M=16, ef_construcao=200):
+        if hnswlib is None:
+            raise ImportError("hnswlib não está instalado (pip install hnswlib)")
+
+        self.ef_busca = ef_busca
+        self.M = M
+        self.ef_construcao = ef_construcao
+        self.galeria = None
+        self._indice = None
+
+    def __len__(self):
+        return 0 if self._indice is None else self._indice.get_current_count()
+
+    def construir(self, encodings, indices=None):
+        matriz = np.ascontiguousarray(encodings, dtype=np.float32)
+        if indices is None:
+            indices = np.arange(len(matriz))
+
+        self._indice = hnswlib.Index(space="l2", dim=matriz.shape[1])
+        self._indice.init_index(max_elements=max(1, len(matriz)), ef_construction=self.ef_construcao, M=self.M)
+        if len(matriz) > 0:
+            self._indice.add_items(matriz, indices)
+        return self
+
+    def inserir(self, encodings, indices=None):
+        novos = np.ascontiguousarray(np.atleast_2d(encodings), dtype=np.float32)
+        if indices is None:
+            indices = np.arange(len(self), len(self) + len(novos))
+
+        necessario = len(self) + len(novos)
+        if necessario > self._indice.get_max_elements():
+            self._indice.resize_index(max(necessario, 2 * self._indice.get_max_elements()))
+        self._indice.add_items(novos, indices)
+
+    def buscar(self, encoding, k=1):
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        self._indice.set_ef(max(self.ef_busca, k))
+        rotulos, quadrados = self._indice.knn_query(np.asarray(encoding, dtype=np.float32), k=k)
+        # hnswlib devolve a distância L2 ao quadrado
+        return rotulos[0].astype(np.int64), np.sqrt(np.maximum(quadrados[0], 0.0))
+
+    def salvar(self, caminho):
+        estado = {
+            "backend": self.backend,
+            "ef_busca": self.ef_busca,
+            "M": self.M,
+            "ef_construcao": self.ef_construcao,
+            "galeria": self.galeria,
+            "indice": self._indice,
+        }
+        with open(caminho, 'wb') as f:
+            pickle.dump(estado, f)
+
+    @classmethod
+    def _de_estado(cls, estado):
+        indice = cls(ef_busca=estado["ef_busca"], M=estado["M"], ef_construcao=estado["ef_construcao"])
+        indice.galeria = estado.get("galeria")
+        indice._indice = estado["indice"]
+        return indice
+
+
+BACKENDS_ANN = {
+    IndiceIVF.backend: IndiceIVF,
+    IndiceHNSW.backend: IndiceHNSW,
+}
+
+
+def criar_indice_ann(backend="ivf", **parametros):
+    """Cria um índice ANN vazio. Sem hnswlib instalado, 'hnsw' recai no IVF em NumPy."""
+    if backend == "hnsw" and hnswlib is None:
+        print("⚠️ hnswlib não encontrado, usando índice IVF em NumPy.")
+        return IndiceIVF()
+    return BACKENDS_ANN[backend](**parametros)
+
+
+def carregar_indice_ann(caminho):
+    """Carrega um índice salvo por salvar(), qualquer que seja o backend."""
+    with open(caminho, 'rb') as f:
+        estado = pickle.load(f)
+    return BACKENDS_ANN[estado["backend"]]._de_estado(estado)
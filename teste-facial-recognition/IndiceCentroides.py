@@ -0,0 +1,78 @@
+import numpy as np
+
+from selecao_templates import ponto_mais_distante, distancias_par_a_par
+
+
+class IndiceCentroides:
+    """
+    Busca 1:N em dois estágios sobre o MatcherGaleria.
+    1) A consulta é comparada com um centróide (ou poucos protótipos) por identidade.
+    2) A varredura exata roda só nas fatias das n_candidatas identidades mais próximas.
+    O custo passa a depender do número de identidades, não do tamanho da galeria.
+    """
+
+    def __init__(self, matcher, n_candidatas=3, prototipos_por_identidade=1):
+        self.matcher = matcher
+        self.n_candidatas = n_candidatas
+        self.prototipos_por_identidade = prototipos_por_identidade
+        self.atualizar()
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def atualizar(self):
+        """(Re)constrói a tabela de protótipos a partir das fatias atuais do matcher."""
+        self.fatias = list(self.matcher.fatias.values())
+
+        prototipos = []
+        identidade_do_prototipo = []
+        for posicao, (inicio, fim) in enumerate(self.fatias):
+            templates = np.asarray(self.matcher.matriz[inicio:fim], dtype=np.float32)
+            if self.prototipos_por_identidade <= 1:
+                escolhidos = templates.mean(axis=0, keepdims=True)
+            elif len(templates) <= self.prototipos_por_identidade:
+                escolhidos = templates
+            else:
+                distancias = distancias_par_a_par(templates.astype(np.float64))
+                escolhidos = templates[ponto_mais_distante(distancias, self.prototipos_por_identidade)]
+
+            prototipos.append(escolhidos)
+            identidade_do_prototipo.extend([posicao] * len(escolhidos))
+
+        dim = self.matcher.matriz.shape[1]
+        self.prototipos = np.ascontiguousarray(np.concatenate(prototipos) if prototipos else np.empty((0, dim)),
+                                               dtype=np.float32)
+        self.normas_prototipos = np.einsum("ij,ij->i", self.prototipos, self.prototipos)
+        self.identidade_do_prototipo = np.asarray(identidade_do_prototipo, dtype=np.int64)
+        # Protótipos de uma mesma identidade são contíguos: início de cada grupo para o reduceat
+        self._inicios_grupos = np.flatnonzero(np.r_[True, np.diff(self.identidade_do_prototipo) != 0])
+
+    def identidades_candidatas(self, probe):
+        """Posições (em self.fatias) das n_candidatas identidades mais próximas."""
+        quadrados = self.normas_prototipos + np.dot(probe, probe) - 2.0 * (self.prototipos @ probe)
+        por_identidade = np.minimum.reduceat(quadrados, self._inicios_grupos)
+
+        n = min(self.n_candidatas, len(por_identidade))
+        return np.argpartition(por_identidade, n - 1)[:n]
+
+    def buscar(self, encoding, k=1):
+        """
+        Retorna: indices (linhas do matcher), distancias, ordenados do mais próximo.
+        """
+        if len(self.fatias) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        probe = np.asarray(encoding, dtype=np.float32)
+        partes_idx = []
+        partes_dist = []
+        for posicao in self.identidades_candidatas(probe):
+            inicio, fim = self.fatias[posicao]
+            partes_idx.append(np.arange(inicio, fim))
+            partes_dist.append(self.matcher.distancias(probe, inicio, fim))
+
+        indices = np.concatenate(partes_idx)
+        distancias = np.concatenate(partes_dist)
+        k = min(k, len(distancias))
+        melhores = np.argpartition(distancias, k - 1)[:k]
+        melhores = melhores[np.argsort(distancias[melhores], kind="stable")]
+        return indices[melhores], distancias[melhores]
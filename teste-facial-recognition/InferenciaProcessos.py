@@ -0,0 +1,151 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from DetectoresFace import DetectorFace, criar_detector
+from EncodersFace import EncoderFace, criar_encoder
+from Reconhecedor import Reconhecedor
+from escala_deteccao import regiao_de_busca
+
+# Inferência em processos separados: o encoding (dlib) e, opcionalmente, a detecção rodam
+# em um pool de processos, fora do GIL do processo da interface (PyQt). Cada processo
+# carrega os modelos uma única vez; as requisições levam só o recorte ao redor das faces.
+# Várias câmeras (um Reconhecedor por CameraThread) podem compartilhar o mesmo pool.
+# A galeria, o cache, a fusão e a regra de decisão continuam no Reconhecedor da câmera.
+# Com um AnelFrames (memória compartilhada), a requisição leva só (slot, sequência) do frame.
+
+# Modelos do processo de inferência (carregados por _iniciar_processo)
+_ENCODER = None
+_DETECTOR = None
+
+
+def _iniciar_processo(encoder, detector):
+    global _ENCODER, _DETECTOR
+    _ENCODER = criar_encoder(encoder)
+    _DETECTOR = criar_detector(detector)
+
+
+def _descrever():
+    return {
+        "encoder": _ENCODER.nome,
+        "espaco": _ENCODER.espaco,
+        "tolerancia": _ENCODER.tolerancia,
+        "entrada_bgr": _ENCODER.entrada_bgr,
+        "detector": _DETECTOR.nome,
+        "usa_cor": _DETECTOR.usa_cor,
+    }
+
+
+def _codificar(recortes, caixas_por_recorte, landmarks_por_recorte):
+    """recortes: imagens ou (AnelFrames, slot, sequencia) de frames na memória compartilhada."""
+    no_anel = [r for r in recortes if isinstance(r, tuple)]
+    imagens = [r[0].ler(r[1], r[2]) if isinstance(r, tuple) else r for r in recortes]
+    if any(imagem is None for imagem in imagens):
+        raise RuntimeError("Frame sobrescrito no AnelFrames antes do encoding")
+
+    encodings = _ENCODER.codificar_lote(imagens, caixas_por_recorte, landmarks_por_recorte)
+    if not all(anel.valido(slot, sequencia) for anel, slot, sequencia in no_anel):
+        raise RuntimeError("Frame sobrescrito no AnelFrames durante o encoding")
+    return encodings
+
+
+def _detectar(imagem, tamanho_min, tamanho_max):
+    return _DETECTOR.detectar(imagem, tamanho_min, tamanho_max)
+
+
+class PoolInferencia:
+    """
+    Pool de processos de inferência (encoder + detector carregados uma vez por processo).
+    n_processos: até 'n' requisições em paralelo (ex.: uma por câmera).
+    timeout: espera máxima (s) por uma resposta; estourado, o Reconhecedor trata como erro de encoding.
+    Usa 'spawn': o processo da interface já tem threads (Qt) e não deve ser copiado por fork.
+    """
+
+    def __init__(self, n_processos=2, encoder="dlib68", detector="haar", timeout=5.0):
+        self.timeout = timeout
+        contexto = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(n_processos, mp_context=contexto, initializer=_iniciar_processo,
+                                             initargs=(encoder, detector))
+        # Primeira requisição: sobe um processo, carrega os modelos e descreve o encoder
+        self.descricao = self._executor.submit(_descrever).result()
+        print(f"✅ Pool de inferência: {n_processos} processos ({self.descricao['encoder']}, "
+              f"{self.descricao['detector']})")
+
+    def codificar(self, recortes, caixas_por_recorte, landmarks_por_recorte):
+        futuro = self._executor.submit(_codificar, recortes, caixas_por_recorte, landmarks_por_recorte)
+        return futuro.result(self.timeout)
+
+    def detectar(self, imagem, tamanho_min, tamanho_max):
+        return self._executor.submit(_detectar, imagem, tamanho_min, tamanho_max).result(self.timeout)
+
+    def fechar(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+class EncoderRemoto(EncoderFace):
+    """
+    Encoder que envia ao PoolInferencia, em uma requisição, o recorte de cada frame que
+    envolve as caixas (com MARGEM_RECORTE do tamanho da face para cada lado, contexto
+    para o alinhamento por landmarks) e as caixas/landmarks nas coordenadas do recorte.
+    anel: AnelFrames da câmera; frames que são slots dele (FrameAnel) vão só como
+        (slot, sequência da gravação); se o slot já foi regravado, o encoding falha.
+    """
+
+    MARGEM_RECORTE = 0.5
+
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+        self.nome = pool.descricao["encoder"]
+        self.espaco = pool.descricao["espaco"]
+        self.tolerancia = pool.descricao["tolerancia"]
+        self.entrada_bgr = pool.descricao["entrada_bgr"]
+        self.anel = None
+
+    def _codificar_lote(self, frames, caixas_por_frame, landmarks_por_frame):
+        recortes, caixas_por_recorte, landmarks_por_recorte = [], [], []
+        for frame, caixas, landmarks in zip(frames, caixas_por_frame, landmarks_por_frame):
+            posicao = self.anel.localizar(frame) if self.anel is not None and len(caixas) else None
+            if posicao is not None:
+                recortes.append((self.anel,) + posicao)
+                caixas_por_recorte.append(list(caixas))
+                landmarks_por_recorte.append(landmarks)
+                continue
+
+            regiao = regiao_de_busca(caixas, frame.shape[0], frame.shape[1], self.MARGEM_RECORTE)
+            if regiao is None:
+                recortes.append(frame[:0, :0])
+                caixas_por_recorte.append([])
+                landmarks_por_recorte.append(None)
+                continue
+
+            x0, y0, x1, y1 = regiao
+            recortes.append(np.ascontiguousarray(frame[y0:y1, x0:x1]))
+            caixas_por_recorte.append([(x - x0, y - y0, w, h) for (x, y, w, h) in caixas])
+            landmarks_por_recorte.append(None if landmarks is None else
+                                         [None if l is None else np.asarray(l) - (x0, y0) for l in landmarks])
+        return self.pool.codificar(recortes, caixas_por_recorte, landmarks_por_recorte)
+
+
+class DetectorRemoto(DetectorFace):
+    """Detector do PoolInferencia (a imagem enviada já vem reduzida pelo Reconhecedor)."""
+
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+        self.nome = pool.descricao["detector"]
+        self.usa_cor = pool.descricao["usa_cor"]
+
+    def _detectar(self, frame, tamanho_min, tamanho_max):
+        return self.pool.detectar(np.ascontiguousarray(frame), tamanho_min, tamanho_max)
+
+
+def criar_reconhecedor_remoto(pool, caminho_pkl="dados_biometricos.pkl", detector_remoto=False, **parametros):
+    """
+    Reconhecedor para o CameraThread com o encoding nos processos do pool (substitui
+    Reconhecedor(...) sem outras mudanças). detector_remoto=False mantém a detecção
+    (OpenCV, que já libera o GIL) no processo da câmera, evitando enviar o frame.
+    """
+    detector = DetectorRemoto(pool) if detector_remoto else pool.descricao["detector"]
+    return Reconhecedor(caminho_pkl, detector=detector, encoder=EncoderRemoto(pool), **parametros)
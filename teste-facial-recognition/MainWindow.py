@@ -1,4 +1,5 @@
 import numpy as np
+import multiprocessing
 import sys
 import os
 import time
@@ -13,6 +14,7 @@ import cv2
 
 from Reconhecedor import Reconhecedor
 from CameraThread import CameraThread
+from InferenciaProcessos import PoolInferencia, criar_reconhecedor_remoto
 
 ID_USUARIOS = {
     "C.J.E.C": "camila",
@@ -25,6 +27,9 @@ ID_USUARIOS = {
 PATH_ICONS = "imgsprojeto/icons/"
 PATH_LOGO = "imgsprojeto/loguinho/logobioaccess.png"
 
+# > 0: o encoding roda em um pool com esse número de processos (fora do GIL da interface)
+PROCESSOS_INFERENCIA = 0
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -32,7 +37,12 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("BioAccess")
         self.setGeometry(100, 100, 800, 600)
 
-        self.recon_engine = Reconhecedor()
+        self.pool_inferencia = None
+        if PROCESSOS_INFERENCIA > 0:
+            self.pool_inferencia = PoolInferencia(PROCESSOS_INFERENCIA)
+            self.recon_engine = criar_reconhecedor_remoto(self.pool_inferencia)
+        else:
+            self.recon_engine = Reconhecedor()
 
         self.current_thread = None
         self.id_selecionado = None
@@ -119,6 +129,8 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         if self.current_thread and self.current_thread.isRunning():
             self.current_thread.stop()
+        if self.pool_inferencia is not None:
+            self.pool_inferencia.fechar()
         event.accept()
 
     def create_header(self):
@@ -408,6 +420,8 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == '__main__':
+    # Processos de inferência no executável gerado pelo PyInstaller
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
 
@@ -0,0 +1,182 @@
+import numpy as np
+
+
+class IdentidadesGaleria:
+    """
+    Ids, níveis e fatias por identidade da galeria, sem os vetores.
+    As linhas são agrupadas por identidade, de modo que os templates de cada usuário
+    ocupam uma fatia contígua (índice de verificação 1:1). Basta sozinho quando as
+    comparações ficam com uma galeria compacta (GaleriaPQ, GaleriaQuantizada).
+    """
+
+    def __init__(self, ids, niveis_acesso, tolerancia=0.6):
+        self.tolerancia = tolerancia
+
+        chaves = np.array([str(i).lower() for i in ids])
+        # Ordenação estável: preserva a ordem original dentro de cada identidade
+        self.ordem = np.argsort(chaves, kind="stable")
+
+        self.ids = [ids[i] for i in self.ordem]
+        self.niveis_acesso = [niveis_acesso[i] for i in self.ordem]
+
+        # id (minúsculo) -> (inicio, fim) da fatia na matriz
+        self.fatias = {}
+        chaves_ordenadas = chaves[self.ordem]
+        if len(chaves_ordenadas) > 0:
+            inicios = np.flatnonzero(np.r_[True, chaves_ordenadas[1:] != chaves_ordenadas[:-1]])
+            fins = np.r_[inicios[1:], len(chaves_ordenadas)]
+            for inicio, fim in zip(inicios, fins):
+                self.fatias[str(chaves_ordenadas[inicio])] = (int(inicio), int(fim))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class MatcherGaleria(IdentidadesGaleria):
+
+    # Quantidade de linhas avaliadas por vez na checagem de impostores
+    BLOCO_IMPOSTOR = 4096
+
+    def __init__(self, encodings, ids, niveis_acesso, tolerancia=0.6):
+        """
+        Prepara a galeria para comparação rápida.
+        Mantém uma matriz float32 contígua e as normas ao quadrado de cada template,
+        calculadas uma única vez no carregamento.
+        As linhas são agrupadas por identidade (IdentidadesGaleria).
+        """
+        super().__init__(ids, niveis_acesso, tolerancia)
+
+        matriz = np.asarray(encodings, dtype=np.float32)
+        if matriz.size == 0:
+            matriz = matriz.reshape(0, 128)
+
+        if np.array_equal(self.ordem, np.arange(len(self.ordem))):
+            # Galeria já gravada agrupada por identidade: evita copiar (ex.: np.memmap)
+            self.matriz = np.ascontiguousarray(matriz)
+        else:
+            self.matriz = np.ascontiguousarray(matriz[self.ordem])
+        self.normas_quadradas = np.einsum("ij,ij->i", self.matriz, self.matriz)
+
+    def __len__(self):
+        return self.matriz.shape[0]
+
+    def distancias(self, encoding: np.ndarray, inicio=0, fim=None) -> np.ndarray:
+        """
+        Distância euclidiana do encoding para os templates [inicio:fim] em uma única passada.
+        Usa ||g - p||² = ||g||² + ||p||² - 2·g·p, onde g·p é um produto matriz-vetor (BLAS).
+        """
+        probe = np.asarray(encoding, dtype=np.float32)
+        quadrados = (self.normas_quadradas[inicio:fim] + np.dot(probe, probe)
+                     - 2.0 * (self.matriz[inicio:fim] @ probe))
+
+        # Erros de arredondamento podem gerar valores levemente negativos
+        np.maximum(quadrados, 0.0, out=quadrados)
+        return np.sqrt(quadrados, out=quadrados)
+
+    def distancias_lote(self, encodings) -> np.ndarray:
+        """
+        Distâncias (m, n) de m encodings para toda a galeria.
+        Todas as consultas saem de um único produto matriz-matriz (GEMM) em vez de m passadas.
+        """
+        probes = np.atleast_2d(np.asarray(encodings, dtype=np.float32))
+        quadrados = (self.normas_quadradas[None, :]
+                     + np.einsum("ij,ij->i", probes, probes)[:, None]
+                     - 2.0 * (probes @ self.matriz.T))
+
+        np.maximum(quadrados, 0.0, out=quadrados)
+        return np.sqrt(quadrados, out=quadrados)
+
+    def melhor_correspondencia(self, encoding: np.ndarray):
+        """
+        Identificação 1:N sobre toda a galeria.
+        Retorna: indice (int), distancia (float), match (bool)
+        Se a galeria estiver vazia retorna (None, inf, False).
+        """
+        if len(self) == 0:
+            return None, float("inf"), False
+
+        distancias = self.distancias(encoding)
+        indice = int(np.argmin(distancias))
+        distancia = float(distancias[indice])
+
+        # Mesmo critério do face_recognition.compare_faces (distancia <= tolerancia)
+        return indice, distancia, distancia <= self.tolerancia
+
+    def verificar(self, encoding: np.ndarray, id_esperado: str, checar_impostor=True):
+        """
+        Verificação 1:1: compara o encoding apenas com a fatia da identidade declarada.
+        Com checar_impostor=True o resultado equivale ao da identificação 1:N
+        (o match só vale se nenhuma outra identidade estiver mais próxima).
+        Retorna: indice (int), distancia (float), match (bool)
+        """
+        fatia = self.fatias.get(id_esperado.lower())
+        if fatia is None:
+            return None, float("inf"), False
+
+        inicio, fim = fatia
+        distancias = self.distancias(encoding, inicio, fim)
+        posicao = int(np.argmin(distancias))
+        distancia = float(distancias[posicao])
+
+        if distancia > self.tolerancia:
+            return inicio + posicao, distancia, False
+
+        if checar_impostor and self._existe_impostor_mais_proximo(encoding, inicio, fim, distancia):
+            return inicio + posicao, distancia, False
+
+        return inicio + posicao, distancia, True
+
+    def melhor_correspondencia_lote(self, encodings, distancias=None):
+        """
+        Identificação 1:N de vários encodings de uma vez.
+        distancias: matriz já calculada por distancias_lote (opcional).
+        Retorna: lista de (indice, distancia, match), como melhor_correspondencia.
+        """
+        if distancias is None:
+            distancias = self.distancias_lote(encodings)
+        if len(self) == 0:
+            return [(None, float("inf"), False)] * len(distancias)
+
+        indices = np.argmin(distancias, axis=1)
+        melhores = distancias[np.arange(len(indices)), indices]
+        return [(int(i), float(d), bool(d <= self.tolerancia)) for i, d in zip(indices, melhores)]
+
+    def verificar_lote(self, encodings, ids_esperados, checar_impostor=True, distancias=None):
+        """
+        Verificação 1:1 de vários encodings (cada um com sua identidade declarada).
+        Sem 'distancias', cada encoding é comparado só com a fatia declarada (como em
+        verificar()) e as demais identidades só são varridas, em blocos, quando a fatia
+        aceita; não se calcula a matriz contra a galeria inteira.
+        distancias: matriz já calculada por distancias_lote (opcional), reaproveitada.
+        Retorna: lista de (indice, distancia, match).
+        """
+        if distancias is None:
+            probes = np.atleast_2d(np.asarray(encodings, dtype=np.float32))
+            return [self.verificar(probe, id_esperado, checar_impostor)
+                    for probe, id_esperado in zip(probes, ids_esperados)]
+
+        resultados = []
+        for linha, id_esperado in zip(distancias, ids_esperados):
+            fatia = self.fatias.get(id_esperado.lower())
+            if fatia is None:
+                resultados.append((None, float("inf"), False))
+                continue
+
+            inicio, fim = fatia
+            posicao = int(np.argmin(linha[inicio:fim]))
+            distancia = float(linha[inicio + posicao])
+
+            match = distancia <= self.tolerancia
+            if match and checar_impostor:
+                match = not (np.any(linha[:inicio] < distancia) or np.any(linha[fim:] < distancia))
+            resultados.append((inicio + posicao, distancia, match))
+        return resultados
+
+    def _existe_impostor_mais_proximo(self, encoding, inicio, fim, distancia):
+        """Varre as demais identidades em blocos e para no primeiro template mais próximo."""
+        for ini_faixa, fim_faixa in ((0, inicio), (fim, len(self))):
+            for ini_bloco in range(ini_faixa, fim_faixa, self.BLOCO_IMPOSTOR):
+                fim_bloco = min(ini_bloco + self.BLOCO_IMPOSTOR, fim_faixa)
+                if np.any(self.distancias(encoding, ini_bloco, fim_bloco) < distancia):
+                    return True
+        return False
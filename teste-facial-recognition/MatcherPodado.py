@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class MatcherPodado:
+    """
+    Varredura exata com terminação antecipada por distância parcial.
+    Os templates são projetados na base PCA da galeria (rotação ortonormal: as distâncias
+    não mudam), para que as primeiras dimensões concentrem a maior parte da variância.
+    A distância ao quadrado é acumulada em blocos de dimensões e as linhas cuja soma
+    parcial já passou do melhor resultado conhecido (ou do limite) são descartadas.
+    """
+
+    FOLGA = 1e-5
+
+    def __init__(self, matcher, tamanho_bloco=32, limite=None):
+        """
+        limite: distância máxima de interesse (ex.: TOLERANCIA). Linhas acima dele são
+        descartadas e, se nenhuma sobrar, a busca retorna vazio.
+        """
+        self.matcher = matcher
+        self.tamanho_bloco = tamanho_bloco
+        self.limite = limite
+
+        matriz = np.asarray(matcher.matriz, dtype=np.float32)
+        dim = matriz.shape[1]
+        self.media = matriz.mean(axis=0) if len(matriz) else np.zeros(dim, np.float32)
+
+        # Autovetores da covariância, do componente de maior variância para o de menor
+        centralizada = (matriz - self.media).astype(np.float64)
+        if len(matriz) > 1:
+            _, autovetores = np.linalg.eigh(centralizada.T @ centralizada)
+            self.base = np.ascontiguousarray(autovetores[:, ::-1], dtype=np.float32)
+        else:
+            self.base = np.eye(dim, dtype=np.float32)
+
+        projetada = (matriz - self.media) @ self.base
+        # Um array contíguo por bloco de dimensões: cada passo lê só as colunas do bloco
+        self.blocos = [
+            np.ascontiguousarray(projetada[:, inicio:inicio + tamanho_bloco])
+            for inicio in range(0, dim, tamanho_bloco)
+        ]
+        # ||x_bloco||² pré-calculado: a distância parcial vira um produto matriz-vetor (BLAS)
+        self.normas_blocos = [np.einsum("ij,ij->i", bloco, bloco) for bloco in self.blocos]
+
+        # Estatística da última busca: fração das multiplicações da varredura completa
+        self.ultima_fracao_calculada = 1.0
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def buscar(self, encoding, k=1):
+        """
+        Resultado exato (mesmos k vizinhos da varredura completa, dentro do limite).
+        Retorna: indices (linhas do matcher), distancias, ordenados do mais próximo.
+        """
+        n = len(self)
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        probe = (np.asarray(encoding, dtype=np.float32) - self.media) @ self.base
+        partes_probe = [probe[i:i + self.tamanho_bloco] for i in range(0, len(probe), self.tamanho_bloco)]
+        k = min(k, n)
+
+        # 1. Primeiro bloco para todas as linhas
+        parciais = self._parcial(0, partes_probe[0])
+        calculadas = n
+
+        # 2. Limiar inicial: distância completa das k linhas com menor soma parcial
+        iniciais = np.argpartition(parciais, k - 1)[:k]
+        completas = parciais[iniciais].copy()
+        for j in range(1, len(self.blocos)):
+            completas += self._parcial(j, partes_probe[j], iniciais)
+        limiar = float(np.max(completas))
+        if self.limite is not None:
+            limiar = min(limiar, self.limite * self.limite)
+        # Folga para o arredondamento do float32: nunca descarta o vencedor verdadeiro
+        limiar += self.FOLGA
+
+        vivos = np.flatnonzero(parciais <= limiar)
+        parciais = parciais[vivos]
+
+        # 3. Blocos seguintes apenas para as linhas que ainda podem vencer
+        for j in range(1, len(self.blocos)):
+            if len(vivos) == 0:
+                break
+            parciais += self._parcial(j, partes_probe[j], vivos)
+            calculadas += len(vivos)
+
+            manter = parciais <= limiar
+            vivos = vivos[manter]
+            parciais = parciais[manter]
+
+        self.ultima_fracao_calculada = calculadas / (n * len(self.blocos))
+
+        if len(vivos) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        k = min(k, len(vivos))
+        melhores = np.argpartition(parciais, k - 1)[:k]
+        melhores = melhores[np.argsort(parciais[melhores], kind="stable")]
+        return vivos[melhores], np.sqrt(np.maximum(parciais[melhores], 0.0))
+
+    def _parcial(self, j, parte, linhas=None):
+        """Contribuição do bloco j para a distância ao quadrado (todas as linhas ou só 'linhas')."""
+        if linhas is None:
+            return self.normas_blocos[j] + np.dot(parte, parte) - 2.0 * (self.blocos[j] @ parte)
+        return self.normas_blocos[j][linhas] + np.dot(parte, parte) - 2.0 * (self.blocos[j][linhas] @ parte)
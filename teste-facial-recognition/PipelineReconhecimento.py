@@ -0,0 +1,215 @@
+import time
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+
+# Caminho de reconhecimento do CameraThread dividido em estágios, cada um em sua thread,
+# ligados por filas limitadas: enquanto o frame N está no encoding (dlib), a detecção /
+# rastreamento (OpenCV, que libera o GIL) já processa o frame N+1. A regra de decisão
+# continua no Reconhecedor; o pipeline só muda onde cada etapa roda.
+# Com descartar_antigos, a entrega para a detecção e para o encoding é de um único lugar
+# e o item novo substitui o que ainda espera (latest-frame-wins, como na CapturaCamera):
+# o encoding sempre pega o frame mais recente, nunca um que esperou vários encodings.
+
+# Espera máxima (s) em get/put das filas, para os estágios perceberem o pedido de parada
+ESPERA_FILA = 0.1
+
+
+class Estagio:
+    """
+    Uma etapa do pipeline: tira um item da fila de entrada, aplica 'funcao' e põe o
+    resultado na fila de saída (bloqueia quando a saída está cheia: contrapressão).
+    descartar_antigo=True: com a saída cheia, o item mais antigo dela é descartado.
+    funcao pode retornar None para não repassar o item. Uma exceção em funcao descarta só
+    aquele item (contado em erros); a thread segue com os próximos.
+    Métricas: tempo de serviço por item e profundidade da fila de entrada a cada item.
+    """
+
+    def __init__(self, nome, funcao, entrada, saida, janela=1000, descartar_antigo=False):
+        self.nome = nome
+        self.funcao = funcao
+        self.entrada = entrada
+        self.saida = saida
+        self.descartar_antigo = descartar_antigo
+
+        self.processados = 0
+        self.descartados = 0
+        self.erros = 0
+        self._tempos_ms = deque(maxlen=janela)
+        self._profundidades = deque(maxlen=janela)
+
+        self._rodando = False
+        self._thread = None
+
+    def iniciar(self):
+        self._rodando = True
+        self._thread = threading.Thread(target=self._executar, name=self.nome, daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._rodando = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _executar(self):
+        while self._rodando:
+            try:
+                item = self.entrada.get(timeout=ESPERA_FILA)
+            except queue.Empty:
+                continue
+            self._profundidades.append(self.entrada.qsize())
+
+            inicio = time.perf_counter()
+            try:
+                resultado = self.funcao(item)
+            except Exception as erro:
+                self.erros += 1
+                print(f"⚠️ Pipeline {self.nome}: item descartado ({type(erro).__name__}: {erro})")
+                continue
+            finally:
+                self._tempos_ms.append((time.perf_counter() - inicio) * 1e3)
+            self.processados += 1
+
+            if resultado is None:
+                continue
+            if self.descartar_antigo:
+                self.descartados += substituir(self.saida, resultado)
+            else:
+                colocar(self.saida, resultado, lambda: self._rodando)
+
+    def metricas(self):
+        tempos = np.array(self._tempos_ms) if self._tempos_ms else np.zeros(1)
+        profundidades = np.array(self._profundidades) if self._profundidades else np.zeros(1)
+        return {
+            "estagio": self.nome,
+            "processados": self.processados,
+            "descartados": self.descartados,
+            "erros": self.erros,
+            "servico_ms_medio": float(tempos.mean()),
+            "servico_ms_p95": float(np.percentile(tempos, 95)),
+            "fila_media": float(profundidades.mean()),
+            "fila_max": int(profundidades.max()),
+        }
+
+
+def colocar(fila, item, continuar):
+    """put bloqueante que desiste quando continuar() fica falso."""
+    while continuar():
+        try:
+            fila.put(item, timeout=ESPERA_FILA)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def substituir(fila, item):
+    """put sem bloqueio: com a fila cheia, descarta o item mais antigo. Retorna quantos descartou."""
+    descartados = 0
+    while True:
+        try:
+            fila.put_nowait(item)
+            return descartados
+        except queue.Full:
+            pass
+        try:
+            fila.get_nowait()
+            descartados += 1
+        except queue.Empty:
+            pass
+
+
+class PipelineReconhecimento:
+    """
+    fonte -> [deteccao] -> [encoding] -> resultados
+    fonte: objeto com ultimo(apos, timeout) -> (sequencia, frame, instante) ou None
+        (ex.: CapturaCamera); uma thread de alimentação pega sempre o frame mais recente.
+    deteccao: rastreador.atualizar(frame) (detecção completa a cada N frames); as trilhas
+        seguem adiante como InstantaneoTrilha (id, bbox, confianca) daquele frame.
+    encoding: recon_engine.autenticar com as trilhas (encoding + comparação com a galeria).
+    resultado(): (sequencia, instante, trilhas, retorno de autenticar, ultima_distancia).
+    descartar_antigos: entrega de um único lugar para a detecção e para o encoding, o item
+        novo substitui o que espera (descartados contam nas métricas). Os resultados
+        nunca são descartados (cada um é evidência para a decisão).
+    tamanho_fila: capacidade das filas sem descarte (com descartar_antigos=False, ex.:
+        benchmark de vazão em que todo frame precisa passar pelo encoding).
+    """
+
+    def __init__(self, fonte, rastreador, recon_engine, nivel_desejado, id_esperado,
+                 cache=None, fusao=None, tamanho_fila=2, descartar_antigos=True):
+        self.fonte = fonte
+        self.rastreador = rastreador
+        self.recon_engine = recon_engine
+        self.nivel_desejado = nivel_desejado
+        self.id_esperado = id_esperado
+        self.cache = cache
+        self.fusao = fusao
+        self.descartar_antigos = descartar_antigos
+
+        tamanho_entrega = 1 if descartar_antigos else tamanho_fila
+        self.fila_deteccao = queue.Queue(maxsize=tamanho_entrega)
+        self.fila_encoding = queue.Queue(maxsize=tamanho_entrega)
+        self.fila_resultados = queue.Queue(maxsize=tamanho_fila)
+
+        self.estagios = [
+            Estagio("deteccao", self._detectar, self.fila_deteccao, self.fila_encoding,
+                    descartar_antigo=descartar_antigos),
+            Estagio("encoding", self._autenticar, self.fila_encoding, self.fila_resultados),
+        ]
+
+        # Frames da fonte substituídos antes de chegar à detecção
+        self.descartados = 0
+        self._rodando = False
+        self._alimentador = None
+
+    def iniciar(self):
+        self._rodando = True
+        for estagio in self.estagios:
+            estagio.iniciar()
+        self._alimentador = threading.Thread(target=self._alimentar, name="alimentacao", daemon=True)
+        self._alimentador.start()
+
+    def parar(self):
+        self._rodando = False
+        if self._alimentador is not None:
+            self._alimentador.join()
+            self._alimentador = None
+        for estagio in self.estagios:
+            estagio.parar()
+
+    def resultado(self, timeout=1.0):
+        try:
+            return self.fila_resultados.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def metricas(self):
+        return [estagio.metricas() for estagio in self.estagios]
+
+    def _alimentar(self):
+        sequencia = 0
+        while self._rodando:
+            leitura = self.fonte.ultimo(sequencia, timeout=ESPERA_FILA)
+            if leitura is None:
+                continue
+            sequencia = leitura[0]
+            if self.descartar_antigos:
+                self.descartados += substituir(self.fila_deteccao, leitura)
+            else:
+                colocar(self.fila_deteccao, leitura, lambda: self._rodando)
+
+    def _detectar(self, leitura):
+        sequencia, frame, instante = leitura
+        # Retrato das trilhas deste frame: o rastreador altera as Trilhas no frame seguinte
+        # enquanto este ainda está no encoding
+        trilhas = [t.instantaneo() for t in self.rastreador.atualizar(frame)]
+        return sequencia, frame, instante, trilhas
+
+    def _autenticar(self, item):
+        sequencia, frame, instante, trilhas = item
+        retorno = self.recon_engine.autenticar(frame, self.nivel_desejado, self.id_esperado,
+                                               trilhas, self.cache, self.fusao)
+        return sequencia, instante, trilhas, retorno, self.recon_engine.ultima_distancia
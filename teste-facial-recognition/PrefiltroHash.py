@@ -0,0 +1,90 @@
+import numpy as np
+
+# Contagem de bits por byte, usada quando o NumPy não tem np.bitwise_count (< 2.0)
+_BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def contar_bits(palavras):
+    """Popcount de cada elemento de um vetor uint64."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(palavras)
+    return _BITS_POR_BYTE[palavras.view(np.uint8).reshape(-1, 8)].sum(axis=1, dtype=np.uint8)
+
+
+class PrefiltroHash:
+    """
+    Pré-filtro por assinatura binária.
+    Cada template vira n_bits bits (sinal de projeções) empacotados em uint64.
+    A consulta ordena a galeria pela distância de Hamming (XOR + popcount) e só a
+    lista curta dos tamanho_lista mais próximos passa pela distância float exata.
+      metodo="lsh": hiperplanos aleatórios (LSH de sinal, aproxima o ângulo)
+      metodo="pca": sinal das componentes principais (n_bits <= dimensão)
+    """
+
+    def __init__(self, matcher, n_bits=256, metodo="lsh", tamanho_lista=256, semente=0):
+        if n_bits % 64 != 0:
+            raise ValueError("n_bits deve ser múltiplo de 64")
+
+        self.matcher = matcher
+        self.metodo = metodo
+        self.tamanho_lista = tamanho_lista
+
+        matriz = np.asarray(matcher.matriz, dtype=np.float32)
+        dim = matriz.shape[1]
+        # Embeddings do dlib não são centrados: sem isso quase todos os sinais coincidem
+        self.media = matriz.mean(axis=0) if len(matriz) else np.zeros(dim, np.float32)
+
+        if metodo == "pca":
+            if n_bits > dim:
+                raise ValueError(f"metodo='pca' aceita no máximo {dim} bits")
+            centralizada = (matriz - self.media).astype(np.float64)
+            _, autovetores = np.linalg.eigh(centralizada.T @ centralizada)
+            self.projecao = np.ascontiguousarray(autovetores[:, ::-1][:, :n_bits], dtype=np.float32)
+        else:
+            rng = np.random.default_rng(semente)
+            self.projecao = rng.standard_normal((dim, n_bits)).astype(np.float32)
+
+        # Layout por palavra (n_bits / 64, n): cada passo do XOR + popcount percorre
+        # um vetor contíguo, sem o custo de reduzir eixos curtos de 2 a 8 palavras
+        self.assinaturas = np.ascontiguousarray(self.assinar(matriz).T)
+        self._buffer = np.empty(len(matriz), dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def assinar(self, matriz):
+        """Assinaturas empacotadas: (n, n_bits / 64) uint64."""
+        bits = ((np.atleast_2d(matriz) - self.media) @ self.projecao) > 0
+        return np.ascontiguousarray(np.packbits(bits, axis=1)).view(np.uint64)
+
+    def distancias_hamming(self, encoding):
+        assinatura = self.assinar(np.asarray(encoding, dtype=np.float32))[0]
+        hamming = np.zeros(self.assinaturas.shape[1], dtype=np.uint16)
+        for palavra, bits_probe in zip(self.assinaturas, assinatura):
+            np.bitwise_xor(palavra, bits_probe, out=self._buffer)
+            hamming += contar_bits(self._buffer)
+        return hamming
+
+    def buscar(self, encoding, k=1):
+        """
+        Retorna: indices (linhas do matcher), distancias exatas, ordenados do mais próximo.
+        """
+        n = len(self)
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        probe = np.asarray(encoding, dtype=np.float32)
+        hamming = self.distancias_hamming(probe)
+
+        n_lista = min(n, max(k, self.tamanho_lista))
+        lista = np.argpartition(hamming, n_lista - 1)[:n_lista]
+        lista.sort()
+
+        candidatos = self.matcher.matriz[lista]
+        quadrados = self.matcher.normas_quadradas[lista] + np.dot(probe, probe) - 2.0 * (candidatos @ probe)
+        distancias = np.sqrt(np.maximum(quadrados, 0.0))
+
+        k = min(k, n_lista)
+        melhores = np.argpartition(distancias, k - 1)[:k]
+        melhores = melhores[np.argsort(distancias[melhores], kind="stable")]
+        return lista[melhores], distancias[melhores]
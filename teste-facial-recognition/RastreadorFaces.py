@@ -0,0 +1,208 @@
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Retrato imutável de uma trilha em um frame (o que o encoding, o cache e a fusão usam);
+# a Trilha continua sendo atualizada pelo rastreador nos frames seguintes
+InstantaneoTrilha = namedtuple("InstantaneoTrilha", "id bbox confianca landmarks")
+
+
+def iou(caixa_a, caixa_b):
+    """Interseção sobre união de duas caixas (x, y, w, h)."""
+    xa, ya, wa, ha = caixa_a
+    xb, yb, wb, hb = caixa_b
+    largura = min(xa + wa, xb + wb) - max(xa, xb)
+    altura = min(ya + ha, yb + hb) - max(ya, yb)
+    if largura <= 0 or altura <= 0:
+        return 0.0
+    intersecao = largura * altura
+    return intersecao / float(wa * ha + wb * hb - intersecao)
+
+
+class Trilha:
+    """Uma face acompanhada entre frames."""
+
+    def __init__(self, id_trilha, bbox, landmarks=None):
+        self.id = id_trilha
+        self.bbox = tuple(int(v) for v in bbox)
+        # 5 landmarks (5, 2) da última detecção, movidos junto com a caixa; None se o detector não os fornece
+        self.landmarks = landmarks
+        # Fração dos pontos do fluxo óptico que sobreviveram no último frame
+        self.confianca = 1.0
+        self.pontos = None
+        # Frames seguidos em que a caixa veio do fluxo óptico (0 = recém detectada)
+        self.frames_propagados = 0
+        # Detecções seguidas em que o detector não encontrou esta face
+        self.falhas = 0
+
+    def instantaneo(self):
+        landmarks = None if self.landmarks is None else self.landmarks.copy()
+        return InstantaneoTrilha(self.id, self.bbox, self.confianca, landmarks)
+
+
+class RastreadorFaces:
+    """
+    Acompanha as faces entre frames para não rodar o detector em todos eles.
+    A detecção completa roda a cada intervalo_deteccao frames, quando não há faces
+    acompanhadas ou quando a confiança de alguma trilha cai abaixo de confianca_minima.
+    Nos demais frames as caixas são propagadas por fluxo óptico (Lucas-Kanade) sobre
+    pontos de canto dentro de cada face. As detecções são associadas às trilhas por IoU,
+    mantendo o id da trilha entre frames. Uma trilha ainda confiável sobrevive a até
+    max_falhas detecções que não a encontrem (o Haar oscila entre frames parecidos).
+    """
+
+    PARAMETROS_LK = dict(
+        winSize=(15, 15),
+        maxLevel=2,
+        criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+    )
+    MAX_PONTOS = 30
+    # Erro máximo (px) da checagem ida-e-volta do fluxo óptico
+    ERRO_IDA_VOLTA = 1.0
+
+    def __init__(self, detector, intervalo_deteccao=10, confianca_minima=0.5, iou_minimo=0.3, max_falhas=2):
+        """
+        detector: função frame -> caixas (x, y, w, h), ex.: Reconhecedor.detectar_faces,
+            ou frame -> (caixas, landmarks (n, 5, 2) ou None); os landmarks ficam na trilha
+        """
+        self.detector = detector
+        self.intervalo_deteccao = intervalo_deteccao
+        self.confianca_minima = confianca_minima
+        self.iou_minimo = iou_minimo
+        self.max_falhas = max_falhas
+
+        self.trilhas = []
+        self._proximo_id = 0
+        self._cinza_anterior = None
+        self._frames_desde_deteccao = 0
+
+        # Estatística: quantos frames passaram pelo detector
+        self.frames = 0
+        self.deteccoes = 0
+
+    def reiniciar(self):
+        """Descarta todas as trilhas (ex.: nova sessão de autenticação)."""
+        self.trilhas = []
+        self._cinza_anterior = None
+        self._frames_desde_deteccao = 0
+
+    def atualizar(self, frame):
+        """Processa um frame. Retorna a lista de trilhas ativas."""
+        cinza = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.frames += 1
+
+        if self.trilhas and self._cinza_anterior is not None:
+            self._propagar(self._cinza_anterior, cinza)
+
+        precisa_detectar = (
+            not self.trilhas
+            or self._frames_desde_deteccao >= self.intervalo_deteccao
+            or any(t.confianca < self.confianca_minima for t in self.trilhas)
+        )
+        if precisa_detectar:
+            deteccao = self.detector(frame)
+            caixas, landmarks = deteccao if isinstance(deteccao, tuple) else (deteccao, None)
+            self._associar(caixas, landmarks)
+            self._frames_desde_deteccao = 0
+            self.deteccoes += 1
+        else:
+            self._frames_desde_deteccao += 1
+
+        for trilha in self.trilhas:
+            if trilha.pontos is None or len(trilha.pontos) < self.MAX_PONTOS // 3:
+                trilha.pontos = self._pontos_na_caixa(cinza, trilha.bbox)
+
+        self._cinza_anterior = cinza
+        return self.trilhas
+
+    def _associar(self, caixas, landmarks=None):
+        """Associa as detecções às trilhas existentes (IoU guloso); o resto vira trilha nova."""
+        caixas = [tuple(int(v) for v in c) for c in caixas]
+        landmarks = [None] * len(caixas) if landmarks is None else [np.asarray(l, np.float32) for l in landmarks]
+        pares = sorted(
+            ((iou(t.bbox, c), i, j) for i, t in enumerate(self.trilhas) for j, c in enumerate(caixas)),
+            reverse=True,
+        )
+
+        usadas_trilhas, usadas_caixas = set(), set()
+        novas = []
+        for valor, i, j in pares:
+            if valor < self.iou_minimo:
+                break
+            if i in usadas_trilhas or j in usadas_caixas:
+                continue
+            trilha = self.trilhas[i]
+            trilha.bbox = caixas[j]
+            trilha.landmarks = landmarks[j]
+            trilha.confianca = 1.0
+            trilha.pontos = None
+            trilha.frames_propagados = 0
+            trilha.falhas = 0
+            usadas_trilhas.add(i)
+            usadas_caixas.add(j)
+            novas.append(trilha)
+
+        # Trilhas sem detecção correspondente continuam só enquanto o fluxo óptico for confiável
+        for i, trilha in enumerate(self.trilhas):
+            if i in usadas_trilhas:
+                continue
+            trilha.falhas += 1
+            if trilha.falhas <= self.max_falhas and trilha.confianca >= self.confianca_minima:
+                novas.append(trilha)
+
+        for j, caixa in enumerate(caixas):
+            if j not in usadas_caixas:
+                novas.append(Trilha(self._proximo_id, caixa, landmarks[j]))
+                self._proximo_id += 1
+
+        self.trilhas = novas
+
+    def _pontos_na_caixa(self, cinza, bbox):
+        x, y, w, h = bbox
+        mascara = np.zeros_like(cinza)
+        mascara[max(y, 0):y + h, max(x, 0):x + w] = 255
+        pontos = cv2.goodFeaturesToTrack(cinza, self.MAX_PONTOS, 0.01, 5, mask=mascara)
+        return pontos if pontos is not None else np.empty((0, 1, 2), np.float32)
+
+    def _propagar(self, cinza_anterior, cinza):
+        """Move cada caixa pelo deslocamento (e escala) medianos dos seus pontos."""
+        altura, largura = cinza.shape
+        for trilha in self.trilhas:
+            pontos = trilha.pontos
+            if pontos is None or len(pontos) < 2:
+                trilha.confianca = 0.0
+                continue
+
+            novos, status, _ = cv2.calcOpticalFlowPyrLK(cinza_anterior, cinza, pontos, None, **self.PARAMETROS_LK)
+            volta, status_volta, _ = cv2.calcOpticalFlowPyrLK(cinza, cinza_anterior, novos, None, **self.PARAMETROS_LK)
+            erro = np.linalg.norm((pontos - volta).reshape(-1, 2), axis=1)
+            bons = (status.ravel() == 1) & (status_volta.ravel() == 1) & (erro < self.ERRO_IDA_VOLTA)
+
+            trilha.confianca = float(bons.mean())
+            if bons.sum() < 2:
+                trilha.confianca = 0.0
+                continue
+
+            antes = pontos.reshape(-1, 2)[bons]
+            depois = novos.reshape(-1, 2)[bons]
+            dx, dy = np.median(depois - antes, axis=0)
+
+            # Escala: razão mediana das distâncias até o centróide
+            dist_antes = np.linalg.norm(antes - antes.mean(axis=0), axis=1)
+            dist_depois = np.linalg.norm(depois - depois.mean(axis=0), axis=1)
+            validos = dist_antes > 1e-3
+            escala = float(np.median(dist_depois[validos] / dist_antes[validos])) if validos.any() else 1.0
+
+            x, y, w, h = trilha.bbox
+            cx, cy = x + w / 2 + dx, y + h / 2 + dy
+            w, h = w * escala, h * escala
+            x = int(round(min(max(cx - w / 2, 0), largura - 1)))
+            y = int(round(min(max(cy - h / 2, 0), altura - 1)))
+            trilha.bbox = (x, y, int(round(w)), int(round(h)))
+            if trilha.landmarks is not None:
+                # Mesmo deslocamento e escala da caixa, em torno do centro
+                centro = np.array([cx - dx, cy - dy], np.float32)
+                trilha.landmarks = ((trilha.landmarks - centro) * escala + centro + (dx, dy)).astype(np.float32)
+            trilha.pontos = depois.reshape(-1, 1, 2).astype(np.float32)
+            trilha.frames_propagados += 1
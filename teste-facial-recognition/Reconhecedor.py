@@ -1,83 +1,338 @@
 
 import pickle
 import numpy as np
-import face_recognition
 import cv2
 
+from MatcherGaleria import MatcherGaleria, IdentidadesGaleria
+from IndiceANN import criar_indice_ann, carregar_indice_ann, impressao_galeria
+from GaleriaCompacta import abrir_galeria_compacta
+from GaleriaPQ import GaleriaPQ
+from GaleriaQuantizada import GaleriaQuantizada
+from IndiceCentroides import IndiceCentroides
+from MatcherPodado import MatcherPodado
+from PrefiltroHash import PrefiltroHash
+from DetectoresFace import criar_detector
+from EncodersFace import criar_encoder, verificar_espaco
+from escala_deteccao import escala_deteccao, reduzir, ampliar_caixas, regiao_de_busca
+
+# Formatos de galeria compacta gerados por converter_galeria.py
+GALERIAS_COMPACTAS = {
+    "pq": GaleriaPQ,
+    "int8": GaleriaQuantizada,
+    "float16": GaleriaQuantizada,
+}
+
 
 class Reconhecedor:
 
-    def __init__(self, caminho_pkl="dados_biometricos.pkl"):
-        """Carrega os embeddings (encodings) e os dados de acesso do arquivo PKL."""
+    def __init__(self, caminho_pkl="dados_biometricos.pkl", caminho_indice_ann=None, busca="exata",
+                 detector="haar", encoder="dlib68", encoder_rapido=None, modo_verificacao=True):
+        """
+        Carrega os embeddings (encodings) e os dados de acesso do arquivo PKL.
+        O PKL pode ser uma galeria compacta (PQ, int8 ou float16, gerada por converter_galeria.py).
+        modo_verificacao: True (padrão) = verificação 1:1 contra o id declarado; False =
+            identificação 1:N, a única que usa caminho_indice_ann e busca (na verificação
+            eles são ignorados, com um aviso, e nenhum índice é construído).
+        caminho_indice_ann: se informado, a identificação 1:N usa um índice ANN
+        (carregado desse arquivo ou construído e salvo nele).
+        busca: estratégia da identificação 1:N sobre a galeria completa
+            "exata"      - varredura em uma passada (MatcherGaleria);
+            "centroides" - centróide por identidade e varredura só das mais próximas;
+            "podada"     - varredura exata com terminação antecipada (base PCA);
+            "hash"       - pré-filtro por assinatura binária (Hamming) + distância exata.
+        detector: backend de detecção de faces ("haar", "lbp", "hog" ou "yunet", ver DetectoresFace.py)
+            ou uma instância de DetectorFace (ex.: DetectorRemoto, InferenciaProcessos.py).
+        encoder: backend de embedding ("dlib68", "dlib5", "dlib68_direto", "dlib5_direto" ou "sface",
+            ver EncodersFace.py; os "_direto" usam o dlib sem o face_recognition, com modelos compartilhados)
+            ou uma instância de EncoderFace (ex.: EncoderRemoto, InferenciaProcessos.py); precisa ser do mesmo espaço de embedding em que a galeria foi gerada.
+        encoder_rapido: se informado (ex.: "dlib5_direto"), reconhecimento em dois níveis: todas
+            as faces passam por ele e só as ambíguas (distância perto da TOLERANCIA) são
+            recodificadas com o 'encoder'. Precisa ser do mesmo espaço de embedding.
+        """
         self.dados = self._carregar_dados(caminho_pkl)
 
+        self.encoder = criar_encoder(encoder)
+
+        # Limiar de distância do espaço de embedding (0.6 para o ResNet do dlib)
+        self.TOLERANCIA = self.encoder.tolerancia
+
+        # Dois níveis: o encoder completo só roda quando |distância - TOLERANCIA| <= MARGEM_ESCALONAMENTO.
+        # TTA_FLIP soma ao segundo nível a média com o encoding da imagem espelhada.
+        self.encoder_rapido = criar_encoder(encoder_rapido) if encoder_rapido else None
+        if self.encoder_rapido is not None and self.encoder_rapido.espaco != self.encoder.espaco:
+            raise ValueError(f"encoder_rapido '{self.encoder_rapido.nome}' não é do espaço '{self.encoder.espaco}'")
+        self.MARGEM_ESCALONAMENTO = 0.08
+        self.TTA_FLIP = False
+        # Estatística do escalonamento
+        self.faces_avaliadas = 0
+        self.faces_escalonadas = 0
 
-        self.TOLERANCIA = 0.6
+        # Verificação 1:1 (compara só com os templates do id_esperado).
+        # Com CHECAR_IMPOSTOR a decisão é a mesma da identificação 1:N sobre toda a galeria.
+        # Definido no construtor: os índices 1:N só são construídos fora desse modo.
+        self.MODO_VERIFICACAO = modo_verificacao
+        self.CHECAR_IMPOSTOR = True
 
-        self.face_detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.caminho_indice_ann = caminho_indice_ann
+        self.busca = busca
+        self._construir_galeria()
+
+        # Detecção em resolução reduzida (largura em px; None = resolução da câmera).
+        # FACE_MINIMA_ESPERADA (px na resolução da câmera) permite reduzir mais no quiosque.
+        self.LARGURA_DETECCAO = 480
+        self.FACE_MINIMA_ESPERADA = None
+
+        # Re-detecção na região ao redor das últimas faces (margem = fração do tamanho da face).
+        # Se nada for encontrado ali, a detecção volta para o frame inteiro.
+        # A cada DETECCOES_QUADRO_INTEIRO detecções na região, uma vai ao frame inteiro
+        # (uma segunda pessoa que entra fora da região também é encontrada).
+        self.USAR_ROI = True
+        self.MARGEM_ROI = 0.5
+        self.VARIACAO_ESCALA_ROI = 1.4
+        self.DETECCOES_QUADRO_INTEIRO = 5
+        self._ultimas_faces = None
+        self._deteccoes_roi = 0
+        # Última comparação dos templates fundidos (FusaoEmbeddings): (trilhas, id), comparacoes
+        self._comparacoes_fusao = None
+
+        self.face_detector = criar_detector(detector)
+        # Landmarks (n, 5, 2) da última detecção, quando o backend os fornece (YuNet)
+        self.ultimos_landmarks = None
+        # Menor distância à identidade declarada no último frame autenticado
+        self.ultima_distancia = None
 
     def _carregar_dados(self, caminho):
         """Método interno para carregar o arquivo pickle."""
         try:
             with open(caminho, 'rb') as f:
                 dados = pickle.load(f)
+                if dados.get("formato") in GALERIAS_COMPACTAS:
+                    dados = abrir_galeria_compacta(dados, caminho)
                 print(f"✅ Dados biométricos carregados. Total de encodings: {len(dados['encodings'])}")
                 return dados
         except FileNotFoundError:
             print(f"❌ Erro: Arquivo de dados biométricos não encontrado em {caminho}")
             return {"encodings": np.array([]), "ids": [], "niveis_acesso": []}
 
-    def autenticar(self, frame_camera: np.ndarray, nivel_desejado: int, id_esperado: str):
+    def _construir_galeria(self):
+        """Monta o matcher e o buscador 1:N a partir de self.dados."""
+        if len(self.dados["ids"]) > 0:
+            verificar_espaco(self.dados, self.encoder)
+
+        formato = self.dados.get("formato")
+        if formato in GALERIAS_COMPACTAS:
+            # Galeria compacta: as comparações usam só os códigos; os vetores float32 (memmap)
+            # não são lidos no carregamento, só as linhas do re-ranking
+            self.matcher = IdentidadesGaleria(self.dados["ids"], self.dados["niveis_acesso"], self.TOLERANCIA)
+            self.buscador = GALERIAS_COMPACTAS[formato].de_dados(self.dados)
+            return
+
+        # Matcher construído uma vez no carregamento (matriz float32 + normas pré-calculadas)
+        self.matcher = MatcherGaleria(
+            self.dados["encodings"],
+            self.dados["ids"],
+            self.dados["niveis_acesso"],
+            self.TOLERANCIA
+        )
+
+        # Buscador para a identificação 1:N (None = varredura exata)
+        self.buscador = None
+        if self.MODO_VERIFICACAO:
+            if self.caminho_indice_ann or self.busca != "exata":
+                print("⚠️ Modo de verificação 1:1: caminho_indice_ann/busca só valem na identificação 1:N "
+                      "(modo_verificacao=False); nenhum índice foi construído.")
+        elif self.caminho_indice_ann:
+            self.buscador = self._carregar_indice_ann(self.caminho_indice_ann)
+        elif self.busca == "centroides":
+            self.buscador = IndiceCentroides(self.matcher)
+        elif self.busca == "podada":
+            self.buscador = MatcherPodado(self.matcher, limite=self.TOLERANCIA)
+        elif self.busca == "hash":
+            self.buscador = PrefiltroHash(self.matcher)
+
+    def atualizar_galeria(self, dados):
+        """Troca a galeria em uso (ex.: após um novo cadastro) e reconstrói os índices."""
+        if len(dados["ids"]) > 0:
+            verificar_espaco(dados, self.encoder)
+        self.dados = dados
+        self._construir_galeria()
+        print(f"✅ Galeria atualizada. Total de encodings: {len(dados['encodings'])}")
+
+    def _carregar_indice_ann(self, caminho):
         """
-        Tenta autenticar um rosto no frame.
-        Retorna: ID_reconhecida (str), Nivel_max_acesso (int), Status (str), bbox (tuple)
+        Carrega o índice ANN; reconstrói se não existir ou não corresponder à galeria
+        (impressão digital dos templates e identidades, não só o tamanho: após um novo
+        treinamento as linhas do índice apontariam para outras pessoas).
+        """
+        impressao = impressao_galeria(self.matcher.matriz, self.matcher.ids)
+        try:
+            indice = carregar_indice_ann(caminho)
+            if indice.galeria == impressao and len(indice) == len(self.matcher):
+                print(f"✅ Índice ANN carregado ({indice.backend}).")
+                return indice
+            print("⚠️ Índice ANN desatualizado em relação à galeria, reconstruindo...")
+        except FileNotFoundError:
+            print(f"⚠️ Índice ANN não encontrado em {caminho}, construindo...")
+
+        # Os índices do ANN são as linhas do matcher (galeria agrupada por identidade)
+        indice = criar_indice_ann().construir(self.matcher.matriz)
+        indice.galeria = impressao
+        indice.salvar(caminho)
+        return indice
+
+    def _identificar(self, encoding):
+        """
+        Identificação 1:N. Retorna: indice (int), distancia (float), match (bool)
         """
+        if self.buscador is None:
+            return self.matcher.melhor_correspondencia(encoding)
 
-        # 1. Detecção da Face
-        cinza = cv2.cvtColor(frame_camera, cv2.COLOR_BGR2GRAY)
-        # Tenta encontrar a face na imagem
-        faces = self.face_detector.detectMultiScale(cinza, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+        indices, distancias = self.buscador.buscar(encoding, 1)
+        if len(indices) == 0:
+            return None, float("inf"), False
 
-        bbox = None
+        distancia = float(distancias[0])
+        return int(indices[0]), distancia, distancia <= self.TOLERANCIA
 
-        if len(faces) == 0:
-            return "Nenhum", 0, "Nenhuma Face Detectada", None
+    def reiniciar_sessao(self):
+        """Esquece a posição das últimas faces e a última comparação fundida (nova sessão de autenticação)."""
+        self._ultimas_faces = None
+        self._deteccoes_roi = 0
+        self._comparacoes_fusao = None
 
+    def detectar_faces(self, frame_camera, usar_roi=True, com_landmarks=False):
+        """
+        Detecção de faces (backend self.face_detector) sobre o frame reduzido para LARGURA_DETECCAO.
+        Com USAR_ROI, procura primeiro na região ao redor das faces da detecção anterior
+        (e no frame inteiro a cada DETECCOES_QUADRO_INTEIRO detecções).
+        usar_roi=False: detecção independente (ex.: frames de fontes diferentes).
+        Retorna as caixas (x, y, w, h) na resolução original do frame.
+        com_landmarks=True: retorna (caixas, landmarks (n, 5, 2) ou None), ex.: para o
+            RastreadorFaces guardar os landmarks de cada trilha.
+        """
+        if self.face_detector.usa_cor:
+            imagem = frame_camera
+        else:
+            imagem = cv2.cvtColor(frame_camera, cv2.COLOR_BGR2GRAY)
+        escala = escala_deteccao(imagem.shape[1], self.LARGURA_DETECCAO, self.FACE_MINIMA_ESPERADA)
 
-        (x, y, w, h) = faces[0]
-        bbox = (x, y, w, h)
+        faces = np.empty((0, 4), dtype=np.int32)
+        regiao = None
+        if usar_roi and self.USAR_ROI and self._ultimas_faces is not None:
+            self._deteccoes_roi += 1
+            if self._deteccoes_roi >= self.DETECCOES_QUADRO_INTEIRO:
+                # Passada periódica no frame inteiro: a região só cobre as faces já conhecidas
+                self._deteccoes_roi = 0
+            else:
+                regiao = regiao_de_busca(self._ultimas_faces, imagem.shape[0], imagem.shape[1], self.MARGEM_ROI)
+        if regiao is not None:
+            x0, y0, x1, y1 = regiao
+            # Na região, a face tem tamanho parecido com o da detecção anterior:
+            # limitar as escalas do detector corta a maior parte das janelas avaliadas
+            larguras = self._ultimas_faces[:, 2] * escala
+            tamanho_min = max(30, int(larguras.min() / self.VARIACAO_ESCALA_ROI))
+            tamanho_max = int(larguras.max() * self.VARIACAO_ESCALA_ROI) + 1
+            faces, landmarks = self._detectar_reduzido(imagem[y0:y1, x0:x1], escala, tamanho_min, tamanho_max)
+            faces[:, :2] += (x0, y0)
+            if landmarks is not None:
+                landmarks += (x0, y0)
 
+        if len(faces) == 0:
+            # Primeira detecção da sessão, passada periódica ou a face saiu da região: frame inteiro
+            faces, landmarks = self._detectar_reduzido(imagem, escala)
 
-        face_rect = [(y, x + w, y + h, x)]
+        self.ultimos_landmarks = landmarks
+        if usar_roi:
+            self._ultimas_faces = faces if len(faces) > 0 else None
+        if com_landmarks:
+            return faces, landmarks
+        return faces
 
-        # 2. Extração e Encoding
-        try:
-            encoding_camera = face_recognition.face_encodings(frame_camera, face_rect)
-        except Exception:
-            return "Erro", 0, "Erro ao gerar encoding da face", bbox
+    def _detectar_reduzido(self, imagem, escala, tamanho_min=30, tamanho_max=None):
+        """Roda o detector na imagem reduzida e devolve caixas e landmarks na escala original."""
+        faces, landmarks = self.face_detector.detectar(reduzir(imagem, escala), tamanho_min, tamanho_max)
+        if landmarks is not None and escala < 1.0:
+            landmarks = landmarks / escala
+        return ampliar_caixas(faces, escala), landmarks
 
-        if not encoding_camera:
-            return "Desconhecido", 0, "Face Válida não encontrada", bbox
+    def _codificar_lote(self, frames, caixas_por_frame, landmarks_por_frame=None):
+        """
+        Encodings de todas as caixas de todos os frames em uma única chamada ao encoder
+        (o encoder_rapido, no reconhecimento em dois níveis).
+        caixas_por_frame: lista (por frame) de listas de bbox (x, y, w, h).
+        landmarks_por_frame: landmarks do detector por frame (usados pelo SFace), ou None.
+        Retorna: lista (por frame) de listas de encodings.
+        """
+        encoder = self.encoder_rapido or self.encoder
+        return encoder.codificar_lote(frames, caixas_por_frame, landmarks_por_frame)
 
-        # 3. Comparação Biometrica
+    # Landmarks do YuNet na face espelhada: olhos e cantos da boca trocam de lado
+    _ORDEM_LANDMARKS_ESPELHADOS = [1, 0, 2, 4, 3]
 
+    def _codificar_completo(self, frames, caixas, landmarks=None):
+        """
+        Segundo nível: encoder completo (e, com TTA_FLIP, média com a face espelhada), uma face por item.
+        landmarks: (5, 2) ou None por face (ex.: das trilhas), para o alinhamento do SFace.
+        """
+        landmarks = [None] * len(frames) if landmarks is None else list(landmarks)
+        if self.TTA_FLIP:
+            espelhados = [cv2.flip(f, 1) for f in frames]
+            caixas_espelhadas = [(f.shape[1] - x - w, y, w, h) for f, (x, y, w, h) in zip(frames, caixas)]
+            landmarks_espelhados = [
+                None if l is None
+                else np.column_stack([f.shape[1] - 1 - l[:, 0], l[:, 1]])[self._ORDEM_LANDMARKS_ESPELHADOS]
+                for f, l in zip(frames, landmarks)
+            ]
+            lotes = self.encoder.codificar_lote(frames + espelhados, [[c] for c in caixas + caixas_espelhadas],
+                                                [[l] for l in landmarks + landmarks_espelhados])
+            n = len(frames)
+            return [(lotes[i][0] + lotes[n + i][0]) / 2.0 for i in range(n)]
 
-        comparacoes = face_recognition.compare_faces(
-            self.dados["encodings"],
-            encoding_camera[0],
-            self.TOLERANCIA
-        )
+        lotes = self.encoder.codificar_lote(frames, [[c] for c in caixas], [[l] for l in landmarks])
+        return [lote[0] for lote in lotes]
 
+    def _escalonar(self, frames, caixas, comparacoes, ids_esperados, candidatas=None, trilhas=None, cache=None):
+        """
+        Reconhecimento em dois níveis: recodifica com o encoder completo só as faces cuja
+        distância do primeiro nível ficou a até MARGEM_ESCALONAMENTO da TOLERANCIA (ou que
+        só foram recusadas por um impostor mais próximo) e refaz a comparação delas.
+        frames, caixas e ids_esperados são por face, alinhados com comparacoes.
+        candidatas: índices das faces que podem escalonar (None = todas); as que vêm do
+            cache já estão com o encoding escalonado (ou não eram ambíguas).
+        trilhas/cache: landmarks das trilhas para o encoder completo; o encoding completo
+            substitui o do primeiro nível no cache da trilha.
+        """
+        if self.encoder_rapido is None:
+            return comparacoes
+
+        indices = range(len(comparacoes)) if candidatas is None else candidatas
+        self.faces_avaliadas += len(indices)
+        ambiguas = [
+            i for i in indices
+            if abs(comparacoes[i][1] - self.TOLERANCIA) <= self.MARGEM_ESCALONAMENTO
+            or (not comparacoes[i][2] and comparacoes[i][1] <= self.TOLERANCIA)
+        ]
+        if not ambiguas:
+            return comparacoes
 
-        face_distances = face_recognition.face_distance(self.dados["encodings"], encoding_camera[0])
-        best_match_index = np.argmin(face_distances)
+        self.faces_escalonadas += len(ambiguas)
+        landmarks = [getattr(trilhas[i], "landmarks", None) for i in ambiguas] if trilhas is not None else None
+        encodings = self._codificar_completo([frames[i] for i in ambiguas], [caixas[i] for i in ambiguas], landmarks)
+        novas = self._comparar_lote(np.array(encodings), [ids_esperados[i] for i in ambiguas])
+        if cache is not None:
+            for i, encoding in zip(ambiguas, encodings):
+                cache.guardar(trilhas[i], encoding)
 
-        id_reconhecida = "Desconhecido"
-        nivel_max_acesso = 0
+        comparacoes = list(comparacoes)
+        for i, comparacao in zip(ambiguas, novas):
+            comparacoes[i] = comparacao
+        return comparacoes
 
-        if comparacoes[best_match_index]:
-            id_match = self.dados["ids"][best_match_index]
-            niveis_match = self.dados["niveis_acesso"][best_match_index]
+    def _decidir(self, indice, match, nivel_desejado, id_esperado, bbox):
+        """Aplica a regra de acesso ao resultado da comparação (retorno de autenticar)."""
+        if match:
+            id_match = self.matcher.ids[indice]
+            niveis_match = self.matcher.niveis_acesso[indice]
 
             # 1. Verifica se a pessoa reconhecida é a pessoa que CLICOU no botão
             if id_match.lower() == id_esperado.lower():
@@ -92,4 +347,234 @@ class Reconhecedor:
                     return id_reconhecida, nivel_max_acesso, "NEGADO: Nível Insuficiente", bbox
 
         # Se saiu do loop sem conceder acesso (Usuário Incorreto ou Não Reconhecido)
-        return "Desconhecido", 0, "ACESSO NEGADO: Usuário Incorreto", bbox
\ No newline at end of file
+        return "Desconhecido", 0, "ACESSO NEGADO: Usuário Incorreto", bbox
+
+    def _comparar_lote(self, probes, ids_esperados):
+        """Compara todos os encodings com a galeria de uma vez. Retorna lista de (indice, distancia, match)."""
+        if self.MODO_VERIFICACAO:
+            if self.dados.get("formato") in GALERIAS_COMPACTAS:
+                # Varredura sobre os códigos compactos + re-ranking exato (o memmap float32 não é varrido)
+                return [self._verificar_compacta(p, i) for p, i in zip(probes, ids_esperados)]
+            # Só a fatia declarada; as demais identidades só se a fatia aceitar
+            return self.matcher.verificar_lote(probes, ids_esperados, self.CHECAR_IMPOSTOR)
+        if self.buscador is None:
+            return self.matcher.melhor_correspondencia_lote(probes)
+        return [self._identificar(p) for p in probes]
+
+    def _verificar_compacta(self, encoding, id_esperado):
+        """Verificação 1:1 pela galeria compacta (self.buscador), nas linhas da identidade declarada."""
+        fatia = self.matcher.fatias.get(id_esperado.lower())
+        if fatia is None:
+            return None, float("inf"), False
+        return self.buscador.verificar(encoding, fatia[0], fatia[1], self.TOLERANCIA, self.CHECAR_IMPOSTOR)
+
+    # Preferência ao escolher qual face do frame reportar
+    _PRIORIDADE_STATUS = {"ACESSO CONCEDIDO": 0, "NEGADO: Nível Insuficiente": 1}
+
+    def _escolher_face(self, comparacoes, caixas, nivel_desejado, id_esperado):
+        """
+        Decide cada face do frame e reporta a que satisfaz a identidade declarada
+        (a mais próxima, se houver mais de uma). Sem nenhuma, reporta a primeira face.
+        Guarda em ultima_distancia a menor distância do frame à identidade declarada.
+        """
+        melhor, chave_melhor = None, None
+        for (indice, distancia, match), bbox in zip(comparacoes, caixas):
+            resultado = self._decidir(indice, match, nivel_desejado, id_esperado, bbox)
+            chave = (self._PRIORIDADE_STATUS.get(resultado[2], 2), distancia)
+            if melhor is None or (chave[0] < 2 and chave < chave_melhor):
+                melhor, chave_melhor = resultado, chave
+            self.ultima_distancia = min(self.ultima_distancia,
+                                        self._distancia_declarada(indice, distancia, match, id_esperado))
+        return melhor
+
+    def _distancia_declarada(self, indice, distancia, match, id_esperado):
+        """Distância da face à identidade declarada (inf se outra identidade estiver mais próxima)."""
+        if indice is None or self.matcher.ids[indice].lower() != id_esperado.lower():
+            return float("inf")
+        if distancia <= self.TOLERANCIA and not match:
+            # Dentro da tolerância, mas recusada por um impostor mais próximo
+            return float("inf")
+        return distancia
+
+    def decidir_identidade_confirmada(self, nivel_desejado, id_esperado, bbox=None):
+        """
+        Regra de acesso para uma identidade já confirmada por vários frames
+        (DecisaoSequencial): só resta conferir o nível. Mesmo retorno de autenticar.
+        """
+        fatia = self.matcher.fatias.get(id_esperado.lower())
+        if fatia is None:
+            return self._decidir(None, False, nivel_desejado, id_esperado, bbox)
+        return self._decidir(fatia[0], True, nivel_desejado, id_esperado, bbox)
+
+    def _codificar_trilhas(self, frame_camera, trilhas, cache, fusao=None):
+        """
+        Encodings das trilhas reaproveitando o CacheEmbeddings: só as trilhas sem
+        entrada válida passam pelo encoder (em uma única chamada).
+        Com fusao (FusaoEmbeddings), cada encoding novo entra na média ponderada da
+        trilha e o retorno são os templates fundidos.
+        Retorna: (encodings, índices das trilhas com encoding novo).
+        """
+        encodings = [cache.obter(t) if cache is not None else None for t in trilhas]
+        faltando = [i for i, e in enumerate(encodings) if e is None]
+        if faltando:
+            novos = self._codificar_lote([frame_camera], [[trilhas[i].bbox for i in faltando]],
+                                         [self._landmarks_trilhas([trilhas[i] for i in faltando])])[0]
+            for i, encoding in zip(faltando, novos):
+                if cache is not None:
+                    cache.guardar(trilhas[i], encoding)
+                if fusao is not None:
+                    fusao.adicionar(trilhas[i], encoding, fusao.qualidade(frame_camera, trilhas[i]))
+                encodings[i] = encoding
+
+        if cache is not None:
+            cache.descartar_ausentes(trilhas)
+        if fusao is not None:
+            fusao.descartar_ausentes(trilhas)
+            encodings = [fusao.obter(t) for t in trilhas]
+        return [e for e in encodings if e is not None], faltando
+
+    @staticmethod
+    def _landmarks_trilhas(trilhas):
+        """Landmarks por caixa guardados nas trilhas (None se nenhuma trilha tiver)."""
+        landmarks = [getattr(t, "landmarks", None) for t in trilhas]
+        return landmarks if any(l is not None for l in landmarks) else None
+
+    def autenticar(self, frame_camera: np.ndarray, nivel_desejado: int, id_esperado: str, trilhas=None,
+                   cache=None, fusao=None):
+        """
+        Tenta autenticar um rosto no frame.
+        Todas as faces detectadas são avaliadas; o retorno é o da face que satisfaz
+        a identidade declarada (ou o da primeira face, se nenhuma satisfizer).
+        trilhas: faces já acompanhadas pelo RastreadorFaces (dispensa a detecção no frame).
+        cache: CacheEmbeddings por trilha (só recalcula o encoding quando a entrada expira).
+        fusao: FusaoEmbeddings por trilha; a galeria só é consultada quando algum template
+            fundido recebe uma amostra nova (senão a última comparação é reaproveitada).
+        Retorna: ID_reconhecida (str), Nivel_max_acesso (int), Status (str), bbox (tuple)
+        A menor distância do frame à identidade declarada fica em ultima_distancia
+        (None se nenhuma face foi comparada com a galeria neste frame ou, com cache,
+        se nenhuma face recebeu encoding novo).
+        """
+        self.ultima_distancia = None
+
+        # 1. Detecção das Faces (ou caixas propagadas pelo rastreador)
+        if trilhas is None:
+            faces = [tuple(f) for f in self.detectar_faces(frame_camera)]
+        else:
+            faces = [t.bbox for t in trilhas]
+
+        if len(faces) == 0:
+            return "Nenhum", 0, "Nenhuma Face Detectada", None
+
+        # 2. Extração e Encoding de todas as faces em uma única chamada
+        novos = None
+        try:
+            if trilhas is not None and (cache is not None or fusao is not None):
+                encodings_camera, novos = self._codificar_trilhas(frame_camera, trilhas, cache, fusao)
+            elif trilhas is not None:
+                encodings_camera = self._codificar_lote([frame_camera], [faces], [self._landmarks_trilhas(trilhas)])[0]
+            else:
+                encodings_camera = self._codificar_lote([frame_camera], [faces], [self.ultimos_landmarks])[0]
+        except Exception:
+            return "Erro", 0, "Erro ao gerar encoding da face", faces[0]
+
+        if not encodings_camera:
+            return "Desconhecido", 0, "Face Válida não encontrada", faces[0]
+
+        # 3. Comparação Biometrica
+        if fusao is not None:
+            return self._comparar_fundidos(encodings_camera, novos, trilhas, nivel_desejado, id_esperado)
+
+        ids_esperados = [id_esperado] * len(encodings_camera)
+        comparacoes = self._comparar_lote(np.array(encodings_camera), ids_esperados)
+        try:
+            # O segundo nível também passa pelo encoder (dlib, processo remoto)
+            comparacoes = self._escalonar([frame_camera] * len(comparacoes), faces, comparacoes, ids_esperados,
+                                          novos, trilhas, cache)
+        except Exception:
+            return "Erro", 0, "Erro ao gerar encoding da face", faces[0]
+        self.ultima_distancia = float("inf")
+        resultado = self._escolher_face(comparacoes, faces, nivel_desejado, id_esperado)
+        if novos is not None:
+            # Encoding do cache repete a medição de um frame anterior: a DecisaoSequencial
+            # só recebe a distância das faces codificadas neste frame
+            self.ultima_distancia = min((self._distancia_declarada(*comparacoes[i], id_esperado) for i in novos),
+                                        default=None)
+        return resultado
+
+    def _comparar_fundidos(self, fundidos, novos, trilhas, nivel_desejado, id_esperado):
+        """
+        Compara os templates fundidos das trilhas com a galeria. Sem amostra nova (e com
+        as mesmas trilhas e a mesma identidade declarada), reaproveita a última comparação.
+        O escalonamento para o encoder completo não se aplica: o template é uma média.
+        """
+        faces = [t.bbox for t in trilhas]
+        chave = (tuple(t.id for t in trilhas), id_esperado)
+        if novos or self._comparacoes_fusao is None or self._comparacoes_fusao[0] != chave:
+            comparacoes = self._comparar_lote(np.array(fundidos), [id_esperado] * len(fundidos))
+            self._comparacoes_fusao = (chave, comparacoes)
+            self.ultima_distancia = float("inf")
+            return self._escolher_face(comparacoes, faces, nivel_desejado, id_esperado)
+
+        self.ultima_distancia = float("inf")
+        resultado = self._escolher_face(self._comparacoes_fusao[1], faces, nivel_desejado, id_esperado)
+        self.ultima_distancia = None
+        return resultado
+
+    def autenticar_lote(self, frames, nivel_desejado, id_esperado, caixas=None):
+        """
+        Autentica vários frames de uma vez (reverificação offline, várias câmeras).
+        nivel_desejado / id_esperado: um valor para todos ou uma lista (um por frame).
+        caixas: bbox (x, y, w, h) já conhecida por frame (ex.: recortes); None = detecta.
+        A detecção roda por frame, os encodings de todas as faces saem de uma única chamada
+        em lote ao encoder e são comparados com a galeria em um único produto de matrizes.
+        Retorna: lista com o mesmo retorno de autenticar para cada frame.
+        """
+        n = len(frames)
+        niveis = nivel_desejado if isinstance(nivel_desejado, (list, tuple)) else [nivel_desejado] * n
+        ids_esperados = id_esperado if isinstance(id_esperado, (list, tuple)) else [id_esperado] * n
+
+        # 1. Detecção por frame
+        faces_por_frame, landmarks_por_frame = [], []
+        for i, frame in enumerate(frames):
+            if caixas is not None and caixas[i] is not None:
+                faces_por_frame.append([tuple(caixas[i])])
+                landmarks_por_frame.append(None)
+            else:
+                faces_por_frame.append([tuple(f) for f in self.detectar_faces(frame, usar_roi=False)])
+                landmarks_por_frame.append(self.ultimos_landmarks)
+
+        erro_encoding = [("Erro", 0, "Erro ao gerar encoding da face", faces[0]) if faces
+                         else ("Nenhum", 0, "Nenhuma Face Detectada", None) for faces in faces_por_frame]
+
+        # 2. Encoding em lote
+        try:
+            encodings = self._codificar_lote(frames, faces_por_frame, landmarks_por_frame)
+        except Exception:
+            return erro_encoding
+
+        # 3. Comparação: uma matriz de distâncias (todas as faces x galeria)
+        probes, ids_probes, frames_probes, caixas_probes = [], [], [], []
+        for i in range(n):
+            probes.extend(encodings[i])
+            ids_probes.extend([ids_esperados[i]] * len(encodings[i]))
+            frames_probes.extend([frames[i]] * len(encodings[i]))
+            caixas_probes.extend(faces_por_frame[i][:len(encodings[i])])
+        comparacoes = self._comparar_lote(np.array(probes), ids_probes) if probes else []
+        try:
+            comparacoes = self._escalonar(frames_probes, caixas_probes, comparacoes, ids_probes)
+        except Exception:
+            return erro_encoding
+
+        saida = []
+        inicio = 0
+        for i, faces in enumerate(faces_por_frame):
+            fim = inicio + len(encodings[i])
+            if not faces:
+                saida.append(("Nenhum", 0, "Nenhuma Face Detectada", None))
+            elif fim == inicio:
+                saida.append(("Desconhecido", 0, "Face Válida não encontrada", faces[0]))
+            else:
+                self.ultima_distancia = float("inf")
+                saida.append(self._escolher_face(comparacoes[inicio:fim], faces, niveis[i], ids_esperados[i]))
+            inicio = fim
+        return saida
@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import cv2
+
+from Reconhecedor import Reconhecedor
+from benchmark_escala_deteccao import montar_frame
+
+# Compara o reconhecimento em dois níveis (encoder rápido + encoder completo só nos casos
+# ambíguos) com o encoder completo em todas as faces. Cada foto de rostos/fotos/<pessoa>
+# é autenticada com a identidade certa (genuína) e com a de outra pessoa (impostora).
+# Mostra a concordância das decisões, a fração escalonada e o tempo de encoding por face.
+# Exemplo: python avaliar_dois_niveis.py dados_biometricos.pkl rostos/fotos
+
+ENCODER_COMPLETO = "dlib68_direto"
+ENCODER_RAPIDO = "dlib5_direto"
+MARGENS = [0.05, 0.08, 0.12]
+
+
+def carregar_fotos_por_pessoa(pasta):
+    fotos = []
+    for pessoa in sorted(os.listdir(pasta)):
+        caminho_pessoa = os.path.join(pasta, pessoa)
+        if not os.path.isdir(caminho_pessoa):
+            continue
+        for nome in sorted(os.listdir(caminho_pessoa)):
+            if nome.lower().endswith(('.jpg', '.jpeg', '.png')):
+                imagem = cv2.imread(os.path.join(caminho_pessoa, nome))
+                if imagem is not None:
+                    fotos.append((montar_frame(imagem, 1.0), pessoa))
+    return fotos
+
+
+def decisoes(recon, casos):
+    """Status de cada (frame, caixas, identidade) e tempo total de encoding (ms)."""
+    status = []
+    for frame, caixas, identidade in casos:
+        recon.detectar_faces = lambda _frame, usar_roi=True, caixas=caixas: caixas
+        status.append(recon.autenticar(frame, 1, identidade)[2])
+    tempo = recon.encoder.tempo_total_ms
+    if recon.encoder_rapido is not None:
+        tempo += recon.encoder_rapido.tempo_total_ms
+    return status, tempo
+
+
+def main():
+    caminho_pkl = sys.argv[1] if len(sys.argv) > 1 else "dados_biometricos.pkl"
+    pasta = sys.argv[2] if len(sys.argv) > 2 else os.path.join("rostos", "fotos")
+    fotos = carregar_fotos_por_pessoa(pasta)
+    pessoas = sorted({pessoa for _, pessoa in fotos})
+    if len(pessoas) < 2:
+        print(f"❌ São necessárias fotos de pelo menos duas pessoas em {pasta}")
+        return
+
+    # As caixas são detectadas uma única vez, para os dois modos avaliarem as mesmas faces
+    referencia = Reconhecedor(caminho_pkl, encoder=ENCODER_COMPLETO)
+    casos = []
+    for frame, pessoa in fotos:
+        caixas = referencia.detectar_faces(frame, usar_roi=False)
+        if len(caixas) == 0:
+            continue
+        impostor = pessoas[(pessoas.index(pessoa) + 1) % len(pessoas)]
+        casos.append((frame, caixas, pessoa))
+        casos.append((frame, caixas, impostor))
+    print(f"{len(casos)} autenticações ({len(casos) // 2} fotos com face, genuína + impostora)")
+
+    inicio = time.perf_counter()
+    esperado, tempo_completo = decisoes(referencia, casos)
+    total_completo = time.perf_counter() - inicio
+    faces = referencia.encoder.faces
+    print(f"  {'completo':<22s} encoding={tempo_completo / faces:6.2f} ms/face  total={total_completo:.2f} s")
+
+    for tta in (False, True):
+        for margem in MARGENS:
+            recon = Reconhecedor(caminho_pkl, encoder=ENCODER_COMPLETO, encoder_rapido=ENCODER_RAPIDO)
+            recon.MARGEM_ESCALONAMENTO = margem
+            recon.TTA_FLIP = tta
+            inicio = time.perf_counter()
+            obtido, tempo = decisoes(recon, casos)
+            total = time.perf_counter() - inicio
+
+            concordancia = sum(a == b for a, b in zip(esperado, obtido)) / len(casos)
+            escalonadas = recon.faces_escalonadas / max(recon.faces_avaliadas, 1)
+            nome = f"margem {margem}" + (" + flip" if tta else "")
+            print(f"  {nome:<22s} encoding={tempo / faces:6.2f} ms/face  total={total:.2f} s  "
+                  f"escalonadas={escalonadas:.1%}  concordância={concordancia:.3f}")
+
+
+if __name__ == '__main__':
+    main()
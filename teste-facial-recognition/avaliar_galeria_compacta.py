@@ -0,0 +1,154 @@
+import os
+import sys
+import pickle
+import tempfile
+import subprocess
+import numpy as np
+
+from MatcherGaleria import MatcherGaleria
+from GaleriaCompacta import agrupar_por_identidade, abrir_galeria_compacta
+from GaleriaPQ import GaleriaPQ, converter_para_pq
+from GaleriaQuantizada import GaleriaQuantizada, converter_para_quantizada
+from utilitarios_benchmark import (
+    galeria_sintetica, consultas_sinteticas, carregar_galeria_real,
+    medir_latencias, resumo_latencias
+)
+
+# Avalia as galerias compactas contra a galeria float64 original:
+# memória, acurácia de identificação 1:N (delta em relação ao exato) e latência.
+# A memória é a da representação compacta (bytes_em_memoria) e o aumento do pico de RSS
+# ao carregar o arquivo pelo Reconhecedor, em um processo novo (Linux).
+
+TOLERANCIA = 0.6
+TAMANHO_SINTETICO = 100_000
+TEMPLATES_POR_IDENTIDADE = 20
+N_CONSULTAS = 1000
+
+
+# Executado em um processo novo: o Reconhecedor começa sem galeria e o pico de RSS é
+# medido só em volta do carregamento (_carregar_dados + atualizar_galeria)
+CODIGO_RSS = """
+import sys
+try:
+    import resource
+except ImportError:
+    print(-1)
+    sys.exit()
+from Reconhecedor import Reconhecedor
+recon = Reconhecedor(sys.argv[1] + ".inexistente")
+antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+recon.atualizar_galeria(recon._carregar_dados(sys.argv[1]))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - antes)
+"""
+
+
+def rss_reconhecedor(caminho):
+    """Aumento do pico de RSS (KB) ao carregar a galeria pelo Reconhecedor; -1 se não disponível."""
+    saida = subprocess.run([sys.executable, "-c", CODIGO_RSS, os.path.abspath(caminho)], capture_output=True,
+                           text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    return int(saida.stdout.split()[-1])
+
+
+def abrir(classe, caminho):
+    """Abre a galeria gravada pelo conversor, pelo mesmo caminho usado no Reconhecedor."""
+    with open(caminho, 'rb') as f:
+        galeria = classe.de_dados(abrir_galeria_compacta(pickle.load(f), caminho))
+    return galeria, galeria.bytes_em_memoria(), caminho
+
+
+def abrir_pq(dados, pasta):
+    caminho = os.path.join(pasta, "galeria_pq.pkl")
+    converter_para_pq(dados, caminho)
+    return abrir(GaleriaPQ, caminho)
+
+
+def abrir_int8(dados, pasta):
+    caminho = os.path.join(pasta, "galeria_int8.pkl")
+    converter_para_quantizada(dados, caminho, "int8")
+    return abrir(GaleriaQuantizada, caminho)
+
+
+def abrir_float16(dados, pasta):
+    caminho = os.path.join(pasta, "galeria_float16.pkl")
+    converter_para_quantizada(dados, caminho, "float16")
+    return abrir(GaleriaQuantizada, caminho)
+
+
+FORMATOS = {
+    "pq": abrir_pq,
+    "int8": abrir_int8,
+    "float16": abrir_float16,
+}
+
+
+def top1(buscar, consulta, excluir):
+    """Melhor resultado ignorando o próprio template (avaliação leave-one-out)."""
+    indices, distancias = buscar(consulta, 2)
+    for indice, distancia in zip(indices, distancias):
+        if indice != excluir:
+            return int(indice), float(distancia)
+    return None, float("inf")
+
+
+def avaliar(titulo, dados, consultas, ids_verdadeiros, excluir):
+    """
+    consultas: encodings de consulta; ids_verdadeiros: id correto de cada consulta;
+    excluir: índice (na ordem agrupada por identidade) a ignorar em cada consulta, ou -1.
+    """
+    n = len(dados["encodings"])
+    bytes_original = n * 128 * 8
+    print("-" * 50)
+    print(f"{titulo}: {n} templates, {len(consultas)} consultas")
+    print(f"  float64 original: {bytes_original / 1024:.1f} KB")
+
+    exato = MatcherGaleria(dados["encodings"], dados["ids"], dados["niveis_acesso"], TOLERANCIA)
+
+    def buscar_exato(consulta, k):
+        distancias = exato.distancias(consulta)
+        indices = np.argpartition(distancias, k - 1)[:k]
+        indices = indices[np.argsort(distancias[indices], kind="stable")]
+        return indices, distancias[indices]
+
+    referencia, latencias = medir_latencias(
+        lambda c: top1(buscar_exato, c[0], c[1]), list(zip(consultas, excluir)))
+    acertos_exato = [exato.ids[i] == v for (i, _), v in zip(referencia, ids_verdadeiros)]
+    print(f"  exato            acurácia={np.mean(acertos_exato):.4f}  {resumo_latencias(latencias)}")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, abrir in FORMATOS.items():
+            galeria, bytes_compacto, caminho = abrir(dados, pasta)
+
+            resultados, latencias = medir_latencias(
+                lambda c: top1(galeria.buscar, c[0], c[1]), list(zip(consultas, excluir)))
+            acertos = [exato.ids[i] == v for (i, _), v in zip(resultados, ids_verdadeiros)]
+            # Mesma decisão do exato: mesmo id e mesmo lado do limiar TOLERANCIA
+            decisoes_iguais = [
+                exato.ids[i] == exato.ids[j] and (d <= TOLERANCIA) == (dr <= TOLERANCIA)
+                for (i, d), (j, dr) in zip(resultados, referencia)
+            ]
+
+            print(f"  {nome:<16s} acurácia={np.mean(acertos):.4f}  "
+                  f"delta={np.mean(acertos) - np.mean(acertos_exato):+.4f}  "
+                  f"decisões iguais={np.mean(decisoes_iguais):.4f}  {resumo_latencias(latencias)}")
+            rss = rss_reconhecedor(caminho)
+            print(f"  {'':<16s} memória={bytes_compacto / 1024:.1f} KB  "
+                  f"redução={bytes_original / bytes_compacto:.1f}x  "
+                  f"RSS no Reconhecedor={'n/d' if rss < 0 else f'{rss:.0f} KB'}")
+
+
+def main():
+    encodings, ids = galeria_sintetica(TAMANHO_SINTETICO, TAMANHO_SINTETICO // TEMPLATES_POR_IDENTIDADE)
+    dados = agrupar_por_identidade({"encodings": encodings, "ids": ids, "niveis_acesso": [[1]] * len(ids)})
+    consultas, origem = consultas_sinteticas(dados["encodings"], N_CONSULTAS)
+    avaliar("Galeria sintética", dados, consultas, [dados["ids"][i] for i in origem], [-1] * len(consultas))
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "dados_biometricos.pkl"
+    real = carregar_galeria_real(caminho)
+    if real is not None:
+        dados = agrupar_por_identidade(real)
+        # Leave-one-out: cada template consulta o restante da galeria
+        avaliar("Galeria real", dados, dados["encodings"], dados["ids"], list(range(len(dados["ids"]))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import sys
+import time
+import queue
+import multiprocessing
+
+import numpy as np
+
+from AnelFrames import AnelFrames
+
+# Transporte de frames 640x480x3 da captura para um processo de inferência:
+#   "fila": o frame vai inteiro pela multiprocessing.Queue (pickle dos dois lados);
+#   "anel": o frame é gravado no AnelFrames e só (slot, sequência) vai pela fila.
+# A captura é simulada no ritmo de 30 e 60 fps; o consumidor lê o frame inteiro (soma de
+# uma amostra de cada linha) como faria o encoder. Mostra o tempo de CPU por frame na
+# captura e no consumidor, a latência captura -> consumidor e os frames perdidos
+# (slot regravado antes da leitura).
+# Exemplo: python benchmark_anel_frames.py 5
+
+FORMA = (480, 640, 3)
+TAXAS = [30, 60]
+SLOTS = 16
+
+
+def consumir(modo, fila, resultados, anel, pronto):
+    pronto.set()
+    latencias, perdidos = [], 0
+    inicio_cpu = time.process_time()
+    while True:
+        item = fila.get()
+        if item is None:
+            break
+        if modo == "fila":
+            _, instante, frame = item
+        else:
+            slot, sequencia, instante = item
+            frame = anel.ler(slot, sequencia)
+            if frame is None:
+                perdidos += 1
+                continue
+        int(frame[:, ::64].sum())
+        latencias.append((time.monotonic() - instante) * 1e3)
+    resultados.put((latencias, perdidos, time.process_time() - inicio_cpu))
+
+
+def executar(modo, fps, duracao, frames_origem):
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue(maxsize=SLOTS // 2)
+    resultados = contexto.Queue()
+    anel = AnelFrames(SLOTS, FORMA) if modo == "anel" else None
+    pronto = contexto.Event()
+    consumidor = contexto.Process(target=consumir, args=(modo, fila, resultados, anel, pronto))
+    consumidor.start()
+    pronto.wait()
+
+    periodo = 1.0 / fps
+    n_frames = int(duracao * fps)
+    cheios = 0
+    # Tempo de CPU do processo da captura: inclui a thread da Queue que faz o pickle
+    inicio_cpu = time.process_time()
+    proximo = time.monotonic()
+    for i in range(n_frames):
+        proximo += periodo
+        frame = frames_origem[i % len(frames_origem)]
+
+        if modo == "fila":
+            item = (i, time.monotonic(), frame)
+        else:
+            slot, sequencia, _ = anel.escrever(frame)
+            item = (slot, sequencia, time.monotonic())
+        try:
+            fila.put(item, timeout=periodo)
+        except queue.Full:
+            cheios += 1
+
+        espera = proximo - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+
+    fila.put(None)
+    cpu_captura = time.process_time() - inicio_cpu
+    latencias, perdidos, cpu_consumidor = resultados.get()
+    consumidor.join()
+    if anel is not None:
+        anel.destruir()
+
+    latencias = np.array(latencias) if latencias else np.zeros(1)
+    print(f"  {modo:<5s} {fps} fps  captura={cpu_captura / n_frames * 1e3:6.3f} ms CPU/frame  "
+          f"consumidor={cpu_consumidor / n_frames * 1e3:6.3f} ms CPU/frame  "
+          f"latência p50={np.percentile(latencias, 50):6.2f} ms  p99={np.percentile(latencias, 99):6.2f} ms  "
+          f"perdidos={perdidos + cheios}/{n_frames}")
+
+
+def main():
+    duracao = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    rng = np.random.default_rng(0)
+    frames_origem = [rng.integers(0, 256, FORMA, dtype=np.uint8) for _ in range(4)]
+    print(f"Frames {FORMA[1]}x{FORMA[0]}x{FORMA[2]} ({np.prod(FORMA) / 1e6:.2f} MB), {duracao:.0f} s por execução")
+    for fps in TAXAS:
+        for modo in ("fila", "anel"):
+            executar(modo, fps, duracao, frames_origem)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import sys
+import time
+import numpy as np
+
+from MatcherGaleria import MatcherGaleria
+from IndiceANN import IndiceIVF, IndiceHNSW, hnswlib
+from utilitarios_benchmark import (
+    galeria_sintetica, consultas_sinteticas, carregar_galeria_real,
+    medir_latencias, resumo_latencias
+)
+
+# --- CONFIGURAÇÃO ---
+
+TAMANHOS_SINTETICOS = [10_000, 100_000]
+TEMPLATES_POR_IDENTIDADE = 20
+N_CONSULTAS = 500
+
+SONDAS_IVF = [1, 2, 4, 8, 16, 32]
+EF_HNSW = [16, 32, 64, 128]
+
+
+def avaliar(nome, matriz, consultas, indice, ajuste, valores):
+    """Compara o índice com o matcher exato: recall@1 e latência por valor do ajuste."""
+    # Com um único id, o matcher mantém a ordem original das linhas
+    exato = MatcherGaleria(matriz, ["galeria"] * len(matriz), [[]] * len(matriz))
+    referencia, latencias_exatas = medir_latencias(lambda q: exato.melhor_correspondencia(q)[1], consultas)
+    print(f"  exato            recall@1=1.000  {resumo_latencias(latencias_exatas)}")
+
+    for valor in valores:
+        setattr(indice, ajuste, valor)
+        resultados, latencias = medir_latencias(lambda q: float(indice.buscar(q, 1)[1][0]), consultas)
+        # Compara distâncias e não índices: a galeria real tem templates duplicados (empates)
+        recall = np.mean(np.isclose(resultados, referencia, atol=1e-5))
+        print(f"  {nome} {ajuste}={valor:<4d} recall@1={recall:.3f}  {resumo_latencias(latencias)}")
+
+
+def avaliar_galeria(titulo, matriz, consultas):
+    print("-" * 50)
+    print(f"{titulo}: {len(matriz)} templates, {len(consultas)} consultas")
+
+    inicio = time.time()
+    ivf = IndiceIVF().construir(matriz)
+    print(f"  IVF construído em {time.time() - inicio:.2f} s ({ivf.n_listas} listas)")
+    avaliar("ivf ", matriz, consultas, ivf, "n_sondas", SONDAS_IVF)
+
+    if hnswlib is not None:
+        inicio = time.time()
+        hnsw = IndiceHNSW().construir(matriz)
+        print(f"  HNSW construído em {time.time() - inicio:.2f} s")
+        avaliar("hnsw", matriz, consultas, hnsw, "ef_busca", EF_HNSW)
+    else:
+        print("  (hnswlib não instalado, pulando HNSW)")
+
+
+def main():
+    for tamanho in TAMANHOS_SINTETICOS:
+        matriz, _ = galeria_sintetica(tamanho, tamanho // TEMPLATES_POR_IDENTIDADE)
+        consultas, _ = consultas_sinteticas(matriz, N_CONSULTAS)
+        avaliar_galeria("Galeria sintética", matriz, consultas)
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "dados_biometricos.pkl"
+    dados = carregar_galeria_real(caminho)
+    if dados is not None:
+        matriz = np.asarray(dados["encodings"], dtype=np.float32)
+        consultas, _ = consultas_sinteticas(matriz, N_CONSULTAS)
+        avaliar_galeria("Galeria real", matriz, consultas)
+
+
+if __name__ == '__main__':
+    main()
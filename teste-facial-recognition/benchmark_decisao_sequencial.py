@@ -0,0 +1,81 @@
+import sys
+import numpy as np
+
+from DecisaoSequencial import DecisaoSequencial, ACEITAR
+
+# Compara a decisão no primeiro frame (regra antiga do CameraThread) com a decisão
+# sequencial (SPRT) em sessões simuladas: cada sessão tem uma distância típica
+# (a do usuário naquele dia/iluminação) e cada frame soma ruído a ela, com alguns
+# frames ruins (face borrada ou não encontrada = distância infinita). Como no CameraThread
+# com CacheEmbeddings, cada encoding é reaproveitado por REPETICOES_CACHE frames: só o
+# primeiro deles é uma medição nova; a linha "contando repetições" alimenta o SPRT com
+# todos os frames (a mesma medição conta várias vezes).
+# Mostra falsa aceitação, falsa rejeição, frames até a decisão e encodings usados.
+# Exemplo: python benchmark_decisao_sequencial.py 5000
+
+TOLERANCIA = 0.6
+MEDIA_GENUINA, DISPERSAO_GENUINA = 0.47, 0.07
+MEDIA_IMPOSTORA, DISPERSAO_IMPOSTORA = 0.78, 0.06
+RUIDO_FRAME = 0.06
+FRACAO_FRAMES_RUINS = 0.05
+MAX_FRAMES = 30
+# Frames que reaproveitam cada encoding (acertos do CacheEmbeddings)
+REPETICOES_CACHE = 4
+
+
+def sessao(rng, media, dispersao):
+    """Distâncias dos frames de uma sessão e quais frames têm encoding novo."""
+    tipica = rng.normal(media, dispersao)
+    medidas = rng.normal(tipica, RUIDO_FRAME, MAX_FRAMES)
+    medidas[rng.random(MAX_FRAMES) < FRACAO_FRAMES_RUINS] = np.inf
+    novos = np.arange(MAX_FRAMES * REPETICOES_CACHE) % REPETICOES_CACHE == 0
+    return np.repeat(medidas, REPETICOES_CACHE), novos
+
+
+def primeiro_frame(distancias, novos):
+    return distancias[0] <= TOLERANCIA, 1, 1
+
+
+def sequencial(distancias, novos, contar_repeticoes=False, **parametros):
+    """Retorna: aceita, frames até a decisão, encodings usados."""
+    decisao = DecisaoSequencial(TOLERANCIA, max_frames=MAX_FRAMES, **parametros)
+    for frame, (distancia, novo) in enumerate(zip(distancias, novos), 1):
+        if not (novo or contar_repeticoes):
+            continue
+        veredito = decisao.adicionar(distancia)
+        if veredito is not None:
+            return veredito == ACEITAR, frame, int(novos[:frame].sum())
+    return False, len(distancias), int(novos.sum())
+
+
+def avaliar(regra, genuinas, impostoras):
+    aceitas_g, frames_g, encodings_g = zip(*[regra(*s) for s in genuinas])
+    aceitas_i, frames_i, encodings_i = zip(*[regra(*s) for s in impostoras])
+    frames = np.array(frames_g + frames_i)
+    encodings = np.array(encodings_g + encodings_i)
+    return 1 - np.mean(aceitas_g), np.mean(aceitas_i), frames.mean(), np.percentile(frames, 95), encodings.mean()
+
+
+def main():
+    n_sessoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = np.random.default_rng(0)
+    genuinas = [sessao(rng, MEDIA_GENUINA, DISPERSAO_GENUINA) for _ in range(n_sessoes)]
+    impostoras = [sessao(rng, MEDIA_IMPOSTORA, DISPERSAO_IMPOSTORA) for _ in range(n_sessoes)]
+
+    regras = {
+        "primeiro frame": primeiro_frame,
+        "SPRT contando repetições": lambda d, n: sequencial(d, n, contar_repeticoes=True),
+        "SPRT a=0.01 b=0.05": lambda d, n: sequencial(d, n),
+        "SPRT a=0.001 b=0.05": lambda d, n: sequencial(d, n, alfa=0.001),
+        "SPRT a=0.01 b=0.01": lambda d, n: sequencial(d, n, beta=0.01),
+    }
+    print(f"{n_sessoes} sessões genuínas + {n_sessoes} impostoras (tolerância {TOLERANCIA}, "
+          f"cada encoding reaproveitado por {REPETICOES_CACHE} frames)")
+    for nome, regra in regras.items():
+        frr, far, media, p95, encodings = avaliar(regra, genuinas, impostoras)
+        print(f"  {nome:<26s} falsa rejeição={frr:.3%}  falsa aceitação={far:.3%}  "
+              f"frames: média={media:.2f}  p95={p95:.0f}  encodings: média={encodings:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import numpy as np
+
+from DetectoresFace import BACKENDS_DETECTOR
+from benchmark_escala_deteccao import carregar_fotos, montar_frame, DISTANCIAS
+
+# Compara os backends de detecção (DetectoresFace.py) nas fotos de rostos/fotos, cada
+# uma colocada em um frame 640x480. Cada foto tem uma pessoa, então o recall é a fração
+# de frames com pelo menos uma face; "extras" conta caixas além da primeira (falsos positivos).
+# Backends sem modelo/dependência instalados são pulados.
+# Exemplo: python benchmark_detectores.py rostos/fotos
+
+
+def main():
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.join("rostos", "fotos")
+    fotos = carregar_fotos(pasta)
+    if not fotos:
+        print(f"❌ Nenhuma foto encontrada em {pasta}")
+        return
+
+    detectores = {}
+    for nome, construtor in BACKENDS_DETECTOR.items():
+        try:
+            detectores[nome] = construtor()
+        except (ImportError, FileNotFoundError) as erro:
+            print(f"⚠️ {nome}: indisponível ({erro})")
+
+    for nome_distancia, fracao in DISTANCIAS.items():
+        frames = [montar_frame(foto, fracao) for foto in fotos]
+        print("-" * 50)
+        print(f"{len(frames)} frames ({nome_distancia})")
+
+        for nome, detector in detectores.items():
+            tempos, contagens, com_landmarks = [], [], 0
+            for frame in frames:
+                caixas, landmarks = detector.detectar(frame)
+                tempos.append(detector.ultimo_tempo_ms)
+                contagens.append(len(caixas))
+                com_landmarks += landmarks is not None and len(landmarks) > 0
+
+            contagens = np.array(contagens)
+            print(f"  {nome:<6s} p50={np.percentile(tempos, 50):7.2f} ms  p99={np.percentile(tempos, 99):7.2f} ms  "
+                  f"recall={np.mean(contagens > 0):.3f}  extras={np.sum(np.maximum(contagens - 1, 0))}  "
+                  f"landmarks={'sim' if com_landmarks else 'não'}")
+
+
+if __name__ == '__main__':
+    main()
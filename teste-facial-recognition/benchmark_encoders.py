@@ -0,0 +1,94 @@
+import os
+import sys
+import cv2
+import numpy as np
+
+from DetectoresFace import criar_detector
+from EncodersFace import BACKENDS_ENCODER
+from MatcherGaleria import MatcherGaleria
+
+# Compara os encoders (EncodersFace.py) nas faces recortadas de rostos/faces (uma pasta
+# por pessoa): latência por face e acurácia 1:N deixando cada imagem de fora da galeria,
+# com a tolerância de cada espaço de embedding. O SFace usa os landmarks do YuNet
+# quando o modelo estiver disponível. Encoders sem modelo/dependência são pulados.
+# Exemplo: python benchmark_encoders.py rostos/faces
+
+
+def carregar_faces(pasta):
+    imagens, ids = [], []
+    for pessoa in sorted(os.listdir(pasta)):
+        caminho_pessoa = os.path.join(pasta, pessoa)
+        if not os.path.isdir(caminho_pessoa):
+            continue
+        for nome in sorted(os.listdir(caminho_pessoa)):
+            if nome.lower().endswith(('.jpg', '.jpeg', '.png')):
+                imagem = cv2.imread(os.path.join(caminho_pessoa, nome))
+                if imagem is not None:
+                    imagens.append(imagem)
+                    ids.append(pessoa)
+    return imagens, ids
+
+
+def deixar_um_de_fora(encodings, ids, tolerancia):
+    """Acurácia 1:N (aceita só se a identidade certa estiver dentro da tolerância)."""
+    matcher = MatcherGaleria(encodings, ids, [[1]] * len(ids), tolerancia)
+    posicao = np.argsort(matcher.ordem)
+    distancias = matcher.distancias_lote(encodings)
+
+    acertos, genuinas, impostoras = 0, [], []
+    for i, linha in enumerate(distancias):
+        linha[posicao[i]] = np.inf
+        melhor = int(np.argmin(linha))
+        acertos += linha[melhor] <= tolerancia and matcher.ids[melhor] == ids[i]
+
+        mesma = np.array([m == ids[i] for m in matcher.ids])
+        genuinas.append(linha[mesma & np.isfinite(linha)].min(initial=np.inf))
+        impostoras.append(linha[~mesma].min(initial=np.inf))
+    return acertos / len(ids), np.mean(genuinas), np.mean(impostoras)
+
+
+def main():
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.join("rostos", "faces")
+    imagens, ids = carregar_faces(pasta)
+    if not imagens:
+        print(f"❌ Nenhuma face encontrada em {pasta}")
+        return
+    print(f"{len(imagens)} faces de {len(set(ids))} pessoas")
+
+    yunet = criar_detector("yunet")
+    caixas, landmarks = [], []
+    for imagem in imagens:
+        encontradas, pontos = yunet.detectar(imagem) if yunet.nome == "yunet" else ([], None)
+        if len(encontradas) > 0:
+            caixas.append([tuple(encontradas[0])])
+            landmarks.append(pontos[:1])
+        else:
+            # Imagem já é o recorte da face
+            caixas.append([(0, 0, imagem.shape[1], imagem.shape[0])])
+            landmarks.append(None)
+
+    for nome, construtor in BACKENDS_ENCODER.items():
+        try:
+            encoder = construtor()
+        except (ImportError, FileNotFoundError) as erro:
+            print(f"⚠️ {nome}: indisponível ({erro})")
+            continue
+
+        entradas = imagens if encoder.entrada_bgr else [cv2.cvtColor(i, cv2.COLOR_BGR2RGB) for i in imagens]
+        tempos, encodings, validos = [], [], []
+        for i, (imagem, caixa, pontos) in enumerate(zip(entradas, caixas, landmarks)):
+            resultado = encoder.codificar(imagem, caixa, pontos)
+            tempos.append(encoder.ultimo_tempo_ms)
+            if resultado:
+                encodings.append(resultado[0])
+                validos.append(i)
+
+        acuracia, genuina, impostora = deixar_um_de_fora(np.array(encodings), [ids[i] for i in validos],
+                                                         encoder.tolerancia)
+        print(f"  {nome:<7s} p50={np.percentile(tempos, 50):7.2f} ms/face  p99={np.percentile(tempos, 99):7.2f} ms  "
+              f"acurácia 1:N={acuracia:.3f}  dist. genuína={genuina:.3f}  impostora={impostora:.3f}  "
+              f"(tolerância {encoder.tolerancia})")
+
+
+if __name__ == '__main__':
+    main()
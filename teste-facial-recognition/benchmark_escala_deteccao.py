@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+from escala_deteccao import escala_deteccao, reduzir, ampliar_caixas
+from RastreadorFaces import iou
+
+# Latência x recall da detecção Haar em função da largura da imagem de detecção.
+# Cada foto de rostos/fotos é colocada em um frame 640x480 (como o da webcam), perto
+# (ocupando a altura do frame) e longe (metade da altura). A referência é a detecção
+# na resolução original; recall = fração das faces de referência reencontradas (IoU >= 0.5).
+# Exemplo: python benchmark_escala_deteccao.py rostos/fotos
+
+LARGURA_FRAME, ALTURA_FRAME = 640, 480
+LARGURAS = [None, 480, 400, 320]
+DISTANCIAS = {"perto": 1.0, "longe": 0.5}
+IOU_MINIMO = 0.5
+
+detector_haar = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+
+def detectar(cinza, largura_deteccao):
+    escala = escala_deteccao(cinza.shape[1], largura_deteccao)
+    faces = detector_haar.detectMultiScale(reduzir(cinza, escala), scaleFactor=1.1,
+                                           minNeighbors=5, minSize=(30, 30))
+    return ampliar_caixas(faces, escala)
+
+
+def montar_frame(imagem, fracao_altura):
+    """Foto centralizada em um frame BGR 640x480 (fundo cinza), com altura = fracao_altura do frame."""
+    altura = int(ALTURA_FRAME * fracao_altura)
+    largura = min(LARGURA_FRAME, int(imagem.shape[1] * altura / imagem.shape[0]))
+    foto = cv2.resize(imagem, (largura, altura))
+    frame = np.full((ALTURA_FRAME, LARGURA_FRAME, 3), 127, dtype=np.uint8)
+    y, x = (ALTURA_FRAME - altura) // 2, (LARGURA_FRAME - largura) // 2
+    frame[y:y + altura, x:x + largura] = foto
+    return frame
+
+
+def carregar_fotos(pasta):
+    fotos = []
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in sorted(arquivos):
+            if nome.lower().endswith(('.jpg', '.jpeg', '.png')):
+                imagem = cv2.imread(os.path.join(raiz, nome))
+                if imagem is not None:
+                    fotos.append(imagem)
+    return fotos
+
+
+def main():
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.join("rostos", "fotos")
+    fotos = carregar_fotos(pasta)
+    if not fotos:
+        print(f"❌ Nenhuma foto encontrada em {pasta}")
+        return
+
+    for nome_distancia, fracao in DISTANCIAS.items():
+        frames = [cv2.cvtColor(montar_frame(foto, fracao), cv2.COLOR_BGR2GRAY) for foto in fotos]
+        referencia = [detectar(frame, None) for frame in frames]
+        total = sum(len(r) for r in referencia)
+
+        print("-" * 50)
+        print(f"{len(frames)} frames ({nome_distancia}), {total} faces na resolução original")
+        for largura in LARGURAS:
+            inicio = time.perf_counter()
+            resultados = [detectar(frame, largura) for frame in frames]
+            tempo = (time.perf_counter() - inicio) / len(frames)
+
+            encontradas = sum(
+                any(iou(tuple(ref), tuple(caixa)) >= IOU_MINIMO for caixa in caixas)
+                for refs, caixas in zip(referencia, resultados) for ref in refs
+            )
+            nome = "original" if largura is None else f"{largura} px"
+            print(f"  {nome:<9s} {tempo * 1e3:6.2f} ms/frame  recall={encontradas / max(total, 1):.3f}")
+
+
+if __name__ == '__main__':
+    main()
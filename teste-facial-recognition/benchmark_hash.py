@@ -0,0 +1,74 @@
+import sys
+import numpy as np
+
+from MatcherGaleria import MatcherGaleria
+from PrefiltroHash import PrefiltroHash
+from utilitarios_benchmark import (
+    galeria_sintetica, consultas_sinteticas, carregar_galeria_real,
+    medir_latencias, resumo_latencias
+)
+
+# Pré-filtro por assinatura binária: confere que a decisão (identidade aceita ou
+# rejeição pela TOLERANCIA) é a mesma da varredura exata e mede a latência.
+
+TOLERANCIA = 0.6
+TAMANHOS_SINTETICOS = [10_000, 100_000]
+TEMPLATES_POR_IDENTIDADE = 20
+N_CONSULTAS = 500
+CONFIGURACOES = [
+    # (metodo, n_bits, tamanho_lista)
+    ("lsh", 128, 64),
+    ("lsh", 256, 64),
+    ("lsh", 256, 256),
+    ("pca", 128, 64),
+    ("pca", 128, 256),
+]
+
+
+def decisao(matcher, indice, distancia):
+    return matcher.ids[indice] if distancia <= TOLERANCIA else None
+
+
+def avaliar(titulo, matcher, consultas):
+    print("-" * 50)
+    print(f"{titulo}: {len(matcher)} templates, {len(consultas)} consultas")
+
+    referencia, latencias = medir_latencias(matcher.melhor_correspondencia, consultas)
+    print(f"  exato                        {resumo_latencias(latencias)}")
+    decisoes_ref = [decisao(matcher, indice, distancia) for indice, distancia, _ in referencia]
+
+    for metodo, n_bits, tamanho_lista in CONFIGURACOES:
+        prefiltro = PrefiltroHash(matcher, n_bits, metodo, tamanho_lista)
+        resultados, latencias = medir_latencias(lambda c: prefiltro.buscar(c, 1), consultas)
+
+        iguais = sum(
+            decisao(matcher, indices[0], distancias[0]) == ref
+            for (indices, distancias), ref in zip(resultados, decisoes_ref)
+        )
+        exatos = sum(
+            np.isclose(distancias[0], distancia_ref, atol=1e-5)
+            for (_, distancias), (_, distancia_ref, _) in zip(resultados, referencia)
+        )
+        lista = min(len(matcher), tamanho_lista)
+        print(f"  {metodo} bits={n_bits:<4d} lista={lista:<4d} ({lista / len(matcher):.2%})  "
+              f"decisões iguais={iguais / len(consultas):.3f}  top-1 exato={exatos / len(consultas):.3f}  "
+              f"{resumo_latencias(latencias)}")
+
+
+def main():
+    for tamanho in TAMANHOS_SINTETICOS:
+        encodings, ids = galeria_sintetica(tamanho, tamanho // TEMPLATES_POR_IDENTIDADE)
+        matcher = MatcherGaleria(encodings, ids, [[1]] * len(ids), TOLERANCIA)
+        consultas, _ = consultas_sinteticas(matcher.matriz, N_CONSULTAS)
+        avaliar("Galeria sintética", matcher, consultas)
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "dados_biometricos.pkl"
+    dados = carregar_galeria_real(caminho)
+    if dados is not None:
+        matcher = MatcherGaleria(dados["encodings"], dados["ids"], dados["niveis_acesso"], TOLERANCIA)
+        consultas, _ = consultas_sinteticas(matcher.matriz, N_CONSULTAS)
+        avaliar("Galeria real", matcher, consultas)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+from Reconhecedor import Reconhecedor
+from RastreadorFaces import RastreadorFaces
+from PipelineReconhecimento import PipelineReconhecimento
+from benchmark_rastreador import video_sintetico, primeira_foto_com_face
+
+# Vazão (frames/s) do reconhecimento serial (detecção/rastreamento e encoding um após
+# o outro, como no CameraThread antigo) contra o PipelineReconhecimento (detecção do
+# frame N+1 enquanto o frame N está no encoding), sobre o vídeo sintético do
+# benchmark_rastreador. Sem cache: todo frame passa pelo encoder (filas sem descarte).
+# Depois, com os frames chegando no ritmo de uma câmera (FPS_CAMERA), compara a idade do
+# frame quando o resultado fica pronto: filas bloqueantes (tamanho_fila=2) contra a entrega
+# de um único lugar que descarta o frame antigo (padrão do CameraThread).
+# Exemplo: python benchmark_pipeline.py rostos/fotos camila
+
+INTERVALOS = [1, 10]
+TAMANHOS_FILA = [1, 2, 4]
+FPS_CAMERA = 30
+
+
+class FonteLista:
+    """Entrega os frames em ordem, sem descartar nenhum (mesma interface da CapturaCamera)."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def ultimo(self, apos=0, timeout=1.0):
+        if apos >= len(self.frames):
+            time.sleep(timeout)
+            return None
+        return apos + 1, self.frames[apos], time.monotonic()
+
+
+class FonteRitmada:
+    """Entrega o frame da vez no ritmo de uma câmera a 'fps' (os que ninguém pediu são perdidos)."""
+
+    def __init__(self, frames, fps):
+        self.frames = frames
+        self.periodo = 1.0 / fps
+        self.inicio = None
+
+    def ultimo(self, apos=0, timeout=1.0):
+        if self.inicio is None:
+            self.inicio = time.monotonic()
+        limite = time.monotonic() + timeout
+        while True:
+            sequencia = min(int((time.monotonic() - self.inicio) / self.periodo) + 1, len(self.frames))
+            if sequencia > apos:
+                return sequencia, self.frames[sequencia - 1], self.inicio + (sequencia - 1) * self.periodo
+            if sequencia == len(self.frames) or time.monotonic() >= limite:
+                time.sleep(max(0.0, limite - time.monotonic()))
+                return None
+            time.sleep(min(self.periodo, max(0.0, limite - time.monotonic())))
+
+
+def serial(recon, frames, intervalo, id_esperado):
+    rastreador = RastreadorFaces(recon.detectar_faces, intervalo)
+    recon.reiniciar_sessao()
+    inicio = time.perf_counter()
+    for frame in frames:
+        trilhas = rastreador.atualizar(frame)
+        recon.autenticar(frame, 1, id_esperado, trilhas)
+    return len(frames) / (time.perf_counter() - inicio)
+
+
+def pipeline(recon, frames, intervalo, id_esperado, tamanho_fila):
+    rastreador = RastreadorFaces(recon.detectar_faces, intervalo)
+    recon.reiniciar_sessao()
+    execucao = PipelineReconhecimento(FonteLista(frames), rastreador, recon, 1, id_esperado,
+                                      tamanho_fila=tamanho_fila, descartar_antigos=False)
+    inicio = time.perf_counter()
+    execucao.iniciar()
+    recebidos = 0
+    while recebidos < len(frames):
+        if execucao.resultado() is not None:
+            recebidos += 1
+    vazao = len(frames) / (time.perf_counter() - inicio)
+    execucao.parar()
+    return vazao, execucao.metricas()
+
+
+def idade_resultados(recon, frames, intervalo, id_esperado, descartar_antigos):
+    """Idade (ms) do frame quando o resultado fica pronto, com a fonte no ritmo da câmera."""
+    rastreador = RastreadorFaces(recon.detectar_faces, intervalo)
+    recon.reiniciar_sessao()
+    execucao = PipelineReconhecimento(FonteRitmada(frames, FPS_CAMERA), rastreador, recon, 1, id_esperado,
+                                      descartar_antigos=descartar_antigos)
+    execucao.iniciar()
+    idades = []
+    limite = time.monotonic() + 2 * len(frames) / FPS_CAMERA + 5.0
+    while time.monotonic() < limite:
+        saida = execucao.resultado()
+        if saida is None:
+            continue
+        idades.append((time.monotonic() - saida[1]) * 1e3)
+        if saida[0] == len(frames):
+            break
+    execucao.parar()
+    return np.array(idades) if idades else np.zeros(1)
+
+
+def main():
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.join("rostos", "fotos")
+    id_esperado = sys.argv[2] if len(sys.argv) > 2 else "camila"
+    caminho, imagem = primeira_foto_com_face(pasta)
+    if imagem is None:
+        print(f"❌ Nenhuma foto com face encontrada em {pasta}")
+        return
+
+    frames = video_sintetico(imagem)
+    recon = Reconhecedor()
+    print(f"Vídeo sintético de {len(frames)} frames a partir de '{caminho}' ({cv2.getNumberOfCPUs()} CPUs)")
+
+    for intervalo in INTERVALOS:
+        print("-" * 50)
+        print(f"Detecção completa a cada {intervalo} frame(s)")
+        vazao_serial = serial(recon, frames, intervalo, id_esperado)
+        print(f"  serial              {vazao_serial:6.1f} frames/s")
+        for tamanho_fila in TAMANHOS_FILA:
+            vazao, metricas = pipeline(recon, frames, intervalo, id_esperado, tamanho_fila)
+            estagios = "  ".join(f"{m['estagio']}={m['servico_ms_medio']:.1f} ms (fila {m['fila_media']:.2f})"
+                                 for m in metricas)
+            print(f"  pipeline fila={tamanho_fila}    {vazao:6.1f} frames/s  ({vazao / vazao_serial:.2f}x)  {estagios}")
+
+        for nome, descartar in (("filas bloqueantes", False), ("descarta antigo", True)):
+            idades = idade_resultados(recon, frames, intervalo, id_esperado, descartar)
+            print(f"  {FPS_CAMERA} fps, {nome:<18s} {len(idades)} resultados  idade do frame: "
+                  f"média={idades.mean():.0f} ms  p95={np.percentile(idades, 95):.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import sys
+import numpy as np
+
+from MatcherGaleria import MatcherGaleria
+from MatcherPodado import MatcherPodado
+from utilitarios_benchmark import (
+    galeria_sintetica, consultas_sinteticas, carregar_galeria_real,
+    medir_latencias, resumo_latencias
+)
+
+# Mede a taxa de poda da varredura com terminação antecipada e confere que o
+# resultado é idêntico ao da varredura completa.
+
+TOLERANCIA = 0.6
+TAMANHOS_SINTETICOS = [10_000, 100_000]
+TEMPLATES_POR_IDENTIDADE = 20
+N_CONSULTAS = 500
+TAMANHOS_BLOCO = [8, 16, 32]
+
+
+def avaliar(titulo, matcher, consultas):
+    print("-" * 50)
+    print(f"{titulo}: {len(matcher)} templates, {len(consultas)} consultas")
+
+    referencia, latencias = medir_latencias(matcher.melhor_correspondencia, consultas)
+    print(f"  exato                         {resumo_latencias(latencias)}")
+
+    for limite in (None, TOLERANCIA):
+        for tamanho_bloco in TAMANHOS_BLOCO:
+            podado = MatcherPodado(matcher, tamanho_bloco, limite)
+
+            def buscar(consulta):
+                indices, distancias = podado.buscar(consulta, 1)
+                return distancias, podado.ultima_fracao_calculada
+
+            resultados, latencias = medir_latencias(buscar, consultas)
+            fracoes = [fracao for _, fracao in resultados]
+
+            # Exato: mesma distância (ou, com limite, vazio só quando o melhor passa do limite)
+            corretos = 0
+            for (distancias, _), (_, distancia_ref, match_ref) in zip(resultados, referencia):
+                if len(distancias) == 0:
+                    corretos += limite is not None and not match_ref
+                else:
+                    corretos += np.isclose(distancias[0], distancia_ref, atol=1e-5)
+
+            nome_limite = "sem limite" if limite is None else f"limite={limite}"
+            print(f"  bloco={tamanho_bloco:<3d} {nome_limite:<12s} poda={1 - np.mean(fracoes):.1%}  "
+                  f"exato={corretos / len(consultas):.3f}  {resumo_latencias(latencias)}")
+
+
+def main():
+    for tamanho in TAMANHOS_SINTETICOS:
+        encodings, ids = galeria_sintetica(tamanho, tamanho // TEMPLATES_POR_IDENTIDADE)
+        matcher = MatcherGaleria(encodings, ids, [[1]] * len(ids), TOLERANCIA)
+        consultas, _ = consultas_sinteticas(matcher.matriz, N_CONSULTAS)
+        avaliar("Galeria sintética", matcher, consultas)
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "dados_biometricos.pkl"
+    dados = carregar_galeria_real(caminho)
+    if dados is not None:
+        matcher = MatcherGaleria(dados["encodings"], dados["ids"], dados["niveis_acesso"], TOLERANCIA)
+        consultas, _ = consultas_sinteticas(matcher.matriz, N_CONSULTAS)
+        avaliar("Galeria real", matcher, consultas)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+from RastreadorFaces import RastreadorFaces, iou
+
+# Compara o custo por frame da detecção Haar em todos os frames com o do rastreador
+# (detecção a cada N frames + fluxo óptico). O vídeo é sintético: uma janela 640x480
+# que passeia e aproxima sobre uma foto de rostos/fotos, simulando a pessoa se mexendo
+# na frente da câmera.
+# Exemplo: python benchmark_rastreador.py rostos/fotos
+
+N_FRAMES = 300
+INTERVALOS = [5, 10, 20]
+LARGURA, ALTURA = 640, 480
+
+detector_haar = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+
+def detectar(frame):
+    cinza = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return detector_haar.detectMultiScale(cinza, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+
+
+def video_sintetico(imagem, n_frames=N_FRAMES):
+    """Frames 640x480 de uma janela que se desloca e muda de escala sobre a imagem."""
+    base = cv2.resize(imagem, (LARGURA * 2, ALTURA * 2))
+    frames = []
+    for t in range(n_frames):
+        fase = 2 * np.pi * t / n_frames
+        escala = 1.0 + 0.15 * np.sin(2 * fase)
+        w, h = int(LARGURA * 1.4 / escala), int(ALTURA * 1.4 / escala)
+        cx = LARGURA + 60 * np.sin(fase)
+        cy = ALTURA + 40 * np.cos(fase)
+        x, y = int(cx - w / 2), int(cy - h / 2)
+        frames.append(cv2.resize(base[y:y + h, x:x + w], (LARGURA, ALTURA)))
+    return frames
+
+
+def primeira_foto_com_face(pasta):
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in sorted(arquivos):
+            imagem = cv2.imread(os.path.join(raiz, nome))
+            if imagem is not None and len(detectar(cv2.resize(imagem, (LARGURA, ALTURA)))) > 0:
+                return os.path.join(raiz, nome), imagem
+    return None, None
+
+
+def main():
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.join("rostos", "fotos")
+    caminho, imagem = primeira_foto_com_face(pasta)
+    if imagem is None:
+        print(f"❌ Nenhuma foto com face encontrada em {pasta}")
+        return
+
+    frames = video_sintetico(imagem)
+    print(f"Vídeo sintético de {len(frames)} frames a partir de '{caminho}'")
+
+    inicio = time.perf_counter()
+    referencia = [detectar(frame) for frame in frames]
+    tempo_haar = (time.perf_counter() - inicio) / len(frames)
+    print(f"  Haar em todos os frames:  {tempo_haar * 1e3:6.2f} ms/frame")
+
+    for intervalo in INTERVALOS:
+        rastreador = RastreadorFaces(detectar, intervalo)
+        inicio = time.perf_counter()
+        resultados = [[t.bbox for t in rastreador.atualizar(frame)] for frame in frames]
+        tempo = (time.perf_counter() - inicio) / len(frames)
+
+        # Concordância com a detecção do próprio frame (quando ambas acharam uma face)
+        ious = [
+            max(iou(caixa, tuple(ref)) for ref in refs)
+            for caixas, refs in zip(resultados, referencia) if len(refs) > 0
+            for caixa in caixas
+        ]
+        print(f"  rastreador N={intervalo:<3d}        {tempo * 1e3:6.2f} ms/frame  "
+              f"({tempo_haar / tempo:.1f}x)  detecções={rastreador.deteccoes / len(frames):.0%} dos frames  "
+              f"IoU médio com Haar={np.mean(ious) if ious else 0:.2f}")
+
+
+if __name__ == '__main__':
+    main()
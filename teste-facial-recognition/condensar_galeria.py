@@ -0,0 +1,150 @@
+import argparse
+import pickle
+import time
+import numpy as np
+
+from MatcherGaleria import MatcherGaleria
+from selecao_templates import distancias_par_a_par, ponto_mais_distante
+from EncodersFace import etiqueta_encoder
+
+# Condensação da galeria: cada identidade fica com no máximo ORCAMENTO templates
+# representativos (medoides), em vez dos ~100 quase repetidos (incluindo as cópias flip-).
+# A saída tem o mesmo formato do dados_biometricos.pkl, então o Reconhecedor a carrega
+# sem nenhuma mudança.
+# Exemplo: python condensar_galeria.py dados_biometricos.pkl dados_condensados.pkl --orcamento 10
+
+ORCAMENTO_PADRAO = 10
+TOLERANCIA = 0.6
+
+
+def k_medoides(distancias, orcamento, iteracoes=20):
+    """
+    k-medoides (iteração de Voronoi) inicializado pelo ponto mais distante.
+    Retorna os índices dos medoides, que são templates reais da galeria.
+    """
+    medoides = np.array(ponto_mais_distante(distancias, orcamento))
+
+    for _ in range(iteracoes):
+        grupos = np.argmin(distancias[:, medoides], axis=1)
+        novos = medoides.copy()
+        for g in range(len(medoides)):
+            membros = np.flatnonzero(grupos == g)
+            if len(membros) > 0:
+                custos = distancias[np.ix_(membros, membros)].sum(axis=1)
+                novos[g] = membros[np.argmin(custos)]
+
+        if np.array_equal(novos, medoides):
+            break
+        medoides = novos
+    return [int(m) for m in medoides]
+
+
+METODOS = {
+    "kmedoides": k_medoides,
+    "mais_distante": ponto_mais_distante,
+}
+
+
+def condensar_galeria(dados, orcamento=ORCAMENTO_PADRAO, metodo="kmedoides"):
+    """
+    Retorna um novo dicionário (encodings, ids, niveis_acesso) com no máximo
+    'orcamento' templates por identidade, na ordem original da galeria.
+    """
+    encodings = np.asarray(dados["encodings"])
+    ids = dados["ids"]
+    chaves = np.array([str(i).lower() for i in ids])
+
+    mantidos = []
+    for chave in dict.fromkeys(chaves):
+        linhas = np.flatnonzero(chaves == chave)
+        if len(linhas) <= orcamento:
+            mantidos.extend(linhas)
+            continue
+
+        distancias = distancias_par_a_par(encodings[linhas].astype(np.float64))
+        mantidos.extend(linhas[METODOS[metodo](distancias, orcamento)])
+
+    mantidos = np.sort(np.array(mantidos, dtype=np.int64))
+    return {
+        "encodings": encodings[mantidos],
+        "ids": [ids[i] for i in mantidos],
+        "niveis_acesso": [dados["niveis_acesso"][i] for i in mantidos],
+        **etiqueta_encoder(dados),
+    }, mantidos
+
+
+def _tempo_medio(matcher, consultas, repeticoes=20):
+    """Tempo médio (s) de uma identificação 1:N por consulta."""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for consulta in consultas:
+            matcher.melhor_correspondencia(consulta)
+    return (time.perf_counter() - inicio) / (repeticoes * len(consultas))
+
+
+def avaliar_condensacao(dados, mantidos):
+    """
+    Usa como consultas os templates descartados: compara a decisão 1:N da galeria
+    completa (sem o próprio template) com a da galeria condensada, e o tempo por consulta.
+    """
+    encodings = np.asarray(dados["encodings"], dtype=np.float32)
+    ids = dados["ids"]
+    descartados = np.setdiff1d(np.arange(len(encodings)), mantidos)
+    if len(descartados) == 0:
+        print("Nenhum template descartado, nada a avaliar.")
+        return
+
+    completa = MatcherGaleria(encodings, ids, dados["niveis_acesso"], TOLERANCIA)
+    condensada = MatcherGaleria(encodings[mantidos], [ids[i] for i in mantidos],
+                                [dados["niveis_acesso"][i] for i in mantidos], TOLERANCIA)
+    posicao_completa = np.argsort(completa.ordem)
+
+    acertos_completa, acertos_condensada, iguais = 0, 0, 0
+    for i in descartados:
+        distancias = completa.distancias(encodings[i])
+        distancias[posicao_completa[i]] = np.inf
+        melhor = int(np.argmin(distancias))
+        decisao_completa = completa.ids[melhor] if distancias[melhor] <= TOLERANCIA else None
+
+        indice, _, match = condensada.melhor_correspondencia(encodings[i])
+        decisao_condensada = condensada.ids[indice] if match else None
+
+        acertos_completa += decisao_completa == ids[i]
+        acertos_condensada += decisao_condensada == ids[i]
+        iguais += decisao_completa == decisao_condensada
+
+    tempo_completa = _tempo_medio(completa, encodings[descartados])
+    tempo_condensada = _tempo_medio(condensada, encodings[descartados])
+
+    n = len(descartados)
+    print(f"Consultas (templates descartados): {n}")
+    print(f"  acurácia galeria completa:   {acertos_completa / n:.4f}  "
+          f"({tempo_completa * 1e6:.1f} µs/consulta)")
+    print(f"  acurácia galeria condensada: {acertos_condensada / n:.4f}  "
+          f"({tempo_condensada * 1e6:.1f} µs/consulta)")
+    print(f"  decisões iguais: {iguais / n:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Condensa a galeria em protótipos por identidade")
+    parser.add_argument("entrada", help="PKL gerado por treinar_encodings.py")
+    parser.add_argument("saida", help="PKL da galeria condensada")
+    parser.add_argument("--orcamento", type=int, default=ORCAMENTO_PADRAO, help="templates por identidade")
+    parser.add_argument("--metodo", choices=list(METODOS), default="kmedoides")
+    args = parser.parse_args()
+
+    with open(args.entrada, 'rb') as f:
+        dados = pickle.load(f)
+
+    condensados, mantidos = condensar_galeria(dados, args.orcamento, args.metodo)
+    print(f"Templates: {len(dados['ids'])} -> {len(condensados['ids'])} "
+          f"(custo por frame ~{len(dados['ids']) / max(1, len(condensados['ids'])):.1f}x menor)")
+    avaliar_condensacao(dados, mantidos)
+
+    with open(args.saida, 'wb') as f:
+        pickle.dump(condensados, f)
+    print(f"✅ Galeria condensada gravada em '{args.saida}'.")
+
+
+if __name__ == '__main__':
+    main()
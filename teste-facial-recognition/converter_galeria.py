@@ -0,0 +1,34 @@
+import argparse
+import pickle
+
+from GaleriaPQ import converter_para_pq
+from GaleriaQuantizada import converter_para_quantizada
+
+# Converte um dados_biometricos.pkl existente para um formato compacto de galeria.
+# Exemplos:
+#   python converter_galeria.py dados_biometricos.pkl dados_pq.pkl --formato pq
+#   python converter_galeria.py dados_biometricos.pkl dados_int8.pkl --formato int8
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversão do dados_biometricos.pkl para galerias compactas")
+    parser.add_argument("entrada", help="PKL gerado por treinar_encodings.py")
+    parser.add_argument("saida", help="PKL da galeria convertida")
+    parser.add_argument("--formato", choices=["pq", "int8", "float16"], default="int8")
+    parser.add_argument("--subespacos", type=int, default=16, help="PQ: bytes por template")
+    parser.add_argument("--centroides", type=int, default=256, help="PQ: centróides por subespaço")
+    args = parser.parse_args()
+
+    with open(args.entrada, 'rb') as f:
+        dados = pickle.load(f)
+
+    print(f"Convertendo {len(dados['encodings'])} encodings para o formato '{args.formato}'...")
+    if args.formato == "pq":
+        converter_para_pq(dados, args.saida, args.subespacos, args.centroides)
+    else:
+        converter_para_quantizada(dados, args.saida, args.formato)
+    print(f"✅ Galeria gravada em '{args.saida}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+
+# Detecção em resolução reduzida: o custo do Haar cresce com o número de pixels,
+# então o frame (em cinza) é reduzido para 320-480 px de largura antes da detecção
+# e as caixas voltam para as coordenadas da resolução original para o encoding.
+# A busca também pode ser restrita a uma região ao redor das últimas faces (ROI).
+
+LARGURA_MINIMA = 320
+LARGURA_MAXIMA = 480
+# minSize usado no detectMultiScale
+TAMANHO_MINIMO_DETECTOR = 30
+
+
+def escala_deteccao(largura_frame, largura_deteccao=LARGURA_MAXIMA, face_minima=None):
+    """
+    Fator de redução aplicado ao frame antes da detecção (1.0 = resolução original).
+    largura_deteccao: largura alvo da imagem de detecção (None = sem redução).
+    face_minima: largura (px, resolução original) da menor face esperada no quiosque.
+        Quando informada, a imagem é reduzida até essa face ficar ~25% acima do minSize,
+        respeitando a faixa LARGURA_MINIMA..largura_deteccao.
+    """
+    if largura_deteccao is None or largura_frame <= 0:
+        return 1.0
+
+    alvo = largura_deteccao
+    if face_minima:
+        alvo_face = largura_frame * 1.25 * TAMANHO_MINIMO_DETECTOR / float(face_minima)
+        alvo = min(largura_deteccao, max(LARGURA_MINIMA, alvo_face))
+
+    return min(1.0, alvo / float(largura_frame))
+
+
+def reduzir(cinza, escala):
+    if escala >= 1.0:
+        return cinza
+    return cv2.resize(cinza, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+
+
+def ampliar_caixas(caixas, escala):
+    """Caixas (x, y, w, h) da imagem reduzida -> coordenadas da resolução original."""
+    caixas = np.asarray(caixas, dtype=np.float64).reshape(-1, 4)
+    if escala >= 1.0:
+        return caixas.astype(np.int32)
+    return np.round(caixas / escala).astype(np.int32)
+
+
+def regiao_de_busca(caixas, altura_frame, largura_frame, margem=0.5):
+    """
+    Retângulo (x0, y0, x1, y1) que envolve as caixas, expandido em 'margem' do tamanho
+    da face para cada lado e recortado aos limites do frame. None se não houver caixas.
+    """
+    caixas = np.asarray(caixas, dtype=np.float64).reshape(-1, 4)
+    if len(caixas) == 0:
+        return None
+
+    folga_x = margem * caixas[:, 2].max()
+    folga_y = margem * caixas[:, 3].max()
+    x0 = int(max(0, caixas[:, 0].min() - folga_x))
+    y0 = int(max(0, caixas[:, 1].min() - folga_y))
+    x1 = int(min(largura_frame, (caixas[:, 0] + caixas[:, 2]).max() + folga_x))
+    y1 = int(min(altura_frame, (caixas[:, 1] + caixas[:, 3]).max() + folga_y))
+    return x0, y0, x1, y1
@@ -0,0 +1,29 @@
+import numpy as np
+
+# Seleção de templates representativos dentro de uma identidade, usada pela
+# condensação da galeria (condensar_galeria.py) e pelos protótipos do IndiceCentroides.
+
+
+def distancias_par_a_par(matriz):
+    """Matriz de distâncias euclidianas entre todas as linhas."""
+    normas = np.einsum("ij,ij->i", matriz, matriz)
+    quadrados = normas[:, None] + normas[None, :] - 2.0 * (matriz @ matriz.T)
+    return np.sqrt(np.maximum(quadrados, 0.0))
+
+
+def ponto_mais_distante(distancias, orcamento):
+    """
+    Seleção gulosa pelo ponto mais distante, a partir do template mais central.
+    Retorna os índices escolhidos.
+    """
+    escolhidos = [int(np.argmin(distancias.sum(axis=1)))]
+    mais_proximo = distancias[escolhidos[0]].copy()
+
+    while len(escolhidos) < orcamento:
+        candidato = int(np.argmax(mais_proximo))
+        if mais_proximo[candidato] == 0.0:
+            # Só restam duplicatas dos já escolhidos
+            break
+        escolhidos.append(candidato)
+        np.minimum(mais_proximo, distancias[candidato], out=mais_proximo)
+    return escolhidos
@@ -3,6 +3,11 @@ import pickle
 import os
 import numpy as np
 import time
+import cv2
+
+from condensar_galeria import condensar_galeria
+from DetectoresFace import criar_detector
+from EncodersFace import criar_encoder
 
 # --- 1. CONFIGURAÇÃO DE DIRETÓRIOS E ACESSO ---
 
@@ -11,6 +16,17 @@ DIR_FACES = "C:\\Users\\Camila\\PycharmProjects\\Autenticacao-Biometrica\\teste-
 
 FILE_OUTPUT = "dados_biometricos.pkl"
 
+# Máximo de templates por usuário após a condensação (None = mantém todos).
+# Ex.: 10 mantém os 10 medoides mais representativos de cada pessoa.
+ORCAMENTO_POR_USUARIO = None
+
+# Encoder dos embeddings ("dlib68", "dlib5", "dlib68_direto", "dlib5_direto" ou "sface").
+# A galeria é gravada com essa etiqueta e o Reconhecedor precisa usar um encoder do mesmo
+# espaço de embedding. O "_direto" chama o dlib sem o face_recognition e codifica em lote.
+ENCODER = "dlib68_direto"
+# "hog" é o detector usado por face_recognition.face_encodings; o SFace alinha melhor com "yunet"
+DETECTOR_TREINO = "hog"
+
 NIVEIS_DE_ACESSO = {
     "camila": [1, 2, 3],  # Camila: Nível 1, 2 e 3
     "vanessa": [1, 2],  # Vanessa: Nível 1 e 2
@@ -31,6 +47,9 @@ def treinar_e_salvar_encodings():
     start_time = time.time()
     print("Iniciando Embedding e Treinamento Biométrico...")
 
+    encoder = criar_encoder(ENCODER)
+    detector = criar_detector(DETECTOR_TREINO)
+
 
     for nome_usuario in os.listdir(DIR_FACES):
         path_usuario = os.path.join(DIR_FACES, nome_usuario)
@@ -42,25 +61,48 @@ def treinar_e_salvar_encodings():
             print(f"-> Processando: {nome_usuario} (Níveis: {niveis_acesso})")
 
 
+            imagens, caixas_por_imagem, landmarks_por_imagem, arquivos = [], [], [], []
             for filename in os.listdir(path_usuario):
                 path_imagem = os.path.join(path_usuario, filename)
 
 
                 if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
                     try:
-                        # Carrega a imagem e gera o embedding (vetor de 128 dimensões)
+                        # Carrega a imagem e localiza a face
                         imagem = face_recognition.load_image_file(path_imagem)
-                        encoding = face_recognition.face_encodings(imagem)
+                        imagem_bgr = cv2.cvtColor(imagem, cv2.COLOR_RGB2BGR)
+                        caixas, landmarks = detector.detectar(imagem_bgr)
+
+                        if len(caixas) > 0:
+                            imagens.append(imagem_bgr if encoder.entrada_bgr else imagem)
+                            caixas_por_imagem.append(caixas[:1])
+                            landmarks_por_imagem.append(landmarks[:1] if landmarks is not None else None)
+                            arquivos.append(filename)
 
-                        if len(encoding) > 0:
-                            # Armazena os dados
-                            conhecidos_encodings.append(encoding[0])
-                            conhecidos_ids.append(nome_usuario)
-                            conhecidos_niveis.append(niveis_acesso)
+                    except Exception as e:
+                        print(f"Erro ao processar {filename}: {e}")
 
+            # Gera os embeddings (vetores de 128 dimensões) de todas as imagens do usuário em lote
+            try:
+                encodings = encoder.codificar_lote(imagens, caixas_por_imagem, landmarks_por_imagem)
+            except Exception as e:
+                # Uma imagem com problema derruba o lote: refaz uma a uma para achar qual
+                print(f"⚠️ Lote de {nome_usuario} falhou ({e}), codificando imagem por imagem.")
+                encodings = []
+                for filename, imagem, caixas, landmarks in zip(arquivos, imagens, caixas_por_imagem,
+                                                                landmarks_por_imagem):
+                    try:
+                        encodings.append(encoder.codificar(imagem, caixas, landmarks))
                     except Exception as e:
                         print(f"Erro ao processar {filename}: {e}")
 
+            for encoding in encodings:
+                if len(encoding) > 0:
+                    # Armazena os dados
+                    conhecidos_encodings.append(encoding[0])
+                    conhecidos_ids.append(nome_usuario)
+                    conhecidos_niveis.append(niveis_acesso)
+
     # --- 3. SALVAMENTO DOS DADOS ---
 
     end_time = time.time()
@@ -71,16 +113,22 @@ def treinar_e_salvar_encodings():
         dados_finais = {
             "encodings": np.array(conhecidos_encodings),
             "ids": conhecidos_ids,
-            "niveis_acesso": conhecidos_niveis
+            "niveis_acesso": conhecidos_niveis,
+            "encoder": encoder.nome,
+            "espaco": encoder.espaco
         }
 
+        if ORCAMENTO_POR_USUARIO:
+            dados_finais, _ = condensar_galeria(dados_finais, ORCAMENTO_POR_USUARIO)
+            print(f"Galeria condensada: {len(conhecidos_ids)} -> {len(dados_finais['ids'])} templates.")
+
 
         with open(FILE_OUTPUT, 'wb') as f:
             pickle.dump(dados_finais, f)
 
         print("-" * 50)
         print(f"✅ Treinamento concluído em {tempo_total:.2f} segundos.")
-        print(f"Total de {len(conhecidos_ids)} embeddings salvos em '{FILE_OUTPUT}'.")
+        print(f"Total de {len(dados_finais['ids'])} embeddings salvos em '{FILE_OUTPUT}'.")
         print("PRÓXIMO PASSO: Integração PyQt em tempo real!")
         print("-" * 50)
     else:
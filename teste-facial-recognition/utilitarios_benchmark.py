@@ -0,0 +1,59 @@
+import pickle
+import time
+import numpy as np
+
+# Espalhamento aproximado dos embeddings reais do dlib (dados_biometricos.pkl):
+# distância genuína média ~0.34 e distância entre pessoas diferentes ~0.72
+DESVIO_IDENTIDADE = 0.040
+DESVIO_AMOSTRA = 0.021
+
+
+def galeria_sintetica(n_templates, n_identidades, dim=128, semente=0):
+    """
+    Gera uma galeria artificial com a mesma escala das distâncias do face_recognition.
+    Retorna: encodings (float32, n_templates x dim), ids (list[str])
+    """
+    rng = np.random.default_rng(semente)
+    centros = rng.normal(0.0, DESVIO_IDENTIDADE, (n_identidades, dim)).astype(np.float32)
+    rotulos = rng.integers(0, n_identidades, n_templates)
+
+    encodings = centros[rotulos] + rng.normal(0.0, DESVIO_AMOSTRA, (n_templates, dim)).astype(np.float32)
+    ids = [f"usuario_{r}" for r in rotulos]
+    return encodings, ids
+
+
+def consultas_sinteticas(encodings, n_consultas, semente=1):
+    """
+    Consultas = templates da galeria com ruído de uma nova captura da mesma pessoa.
+    Retorna: consultas (n_consultas x dim), origem (índice do template usado em cada consulta)
+    """
+    rng = np.random.default_rng(semente)
+    origem = rng.integers(0, len(encodings), n_consultas)
+    ruido = rng.normal(0.0, DESVIO_AMOSTRA, (n_consultas, encodings.shape[1])).astype(np.float32)
+    return encodings[origem] + ruido, origem
+
+
+def carregar_galeria_real(caminho="dados_biometricos.pkl"):
+    """Carrega o PKL de produção. Retorna None se o arquivo não existir."""
+    try:
+        with open(caminho, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        print(f"❌ Arquivo {caminho} não encontrado, pulando galeria real.")
+        return None
+
+
+def medir_latencias(funcao, consultas):
+    """Executa funcao(consulta) para cada consulta e devolve (resultados, latencias em ms)."""
+    resultados = []
+    latencias = np.empty(len(consultas))
+    for i, consulta in enumerate(consultas):
+        inicio = time.perf_counter()
+        resultados.append(funcao(consulta))
+        latencias[i] = (time.perf_counter() - inicio) * 1000.0
+    return resultados, latencias
+
+
+def resumo_latencias(latencias):
+    """Texto com p50 e p99 em milissegundos."""
+    return f"p50={np.percentile(latencias, 50):.3f} ms  p99={np.percentile(latencias, 99):.3f} ms"